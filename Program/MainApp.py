@@ -1,5 +1,10 @@
+import logging
 import tkinter as tk
 from collection import CollectionPage
+from db.executor import get_executor
+import sessions
+
+log = logging.getLogger("pokemon_shiny.sessions")
 
 
 class MainApp:
@@ -8,6 +13,7 @@ class MainApp:
         self.logged_in = False  # Track login state
         self.current_user = None  # Track current user
         self.setup_main_window()
+        self.resume_session()
 
     def setup_main_window(self):
         """Initialize main window widgets and settings"""
@@ -27,14 +33,36 @@ class MainApp:
         )
         self.collection_button.pack(pady=20)
 
-        # self.update_ui_state()
+        self.update_ui_state()
+
+    def update_ui_state(self):
+        """Update UI based on login state"""
+        if self.logged_in:
+            self.collection_button.config(text=f"Continue as {self.current_user}")
+        else:
+            self.collection_button.config(text="Open Collection Page")
+
+    def resume_session(self):
+        """Log back in with the token saved by the last login, if it is still valid"""
+        token = sessions.load_token()
+        if not token:
+            return
+        get_executor(self.root).submit(sessions.resume_session, token,
+                                       on_success=self.on_session_resumed,
+                                       on_error=self.on_session_error)
+
+    def on_session_error(self, error):
+        # The saved token is kept; the user can still log in by hand
+        log.warning("Could not resume session: %s", error)
 
-    # def update_ui_state(self):
-    #     """Update UI based on login state"""
-    #     if self.logged_in:
-    #         self.collection_button.config(text=f"Continue as {self.current_user}")
-    #     else:
-    #         self.collection_button.config(text="Open Collection Page")
+    def on_session_resumed(self, username):
+        if username is None:
+            sessions.forget_token()  # Expired or revoked
+            return
+        if not self.logged_in:
+            self.logged_in = True
+            self.current_user = username
+            self.update_ui_state()
 
     def open_collection(self):
         """Open collection window with current login state"""
@@ -61,7 +89,7 @@ class MainApp:
         self.current_user = current_user
         self.root.geometry(f"800x600+{position[0]}+{position[1]}")
         self.root.deiconify()
-        #self.update_ui_state()
+        self.update_ui_state()
 
 
 if __name__ == "__main__":
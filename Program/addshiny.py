@@ -1,17 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk, ImageDraw, ImageFont
-import os
-from db import dbconnection as dbc
+from db import queries
+from db import refcache
+from db.executor import get_executor, JobGroup
+from spritelib import get_sprite_cache
 
 
 class AddShinyWindow:
-    def __init__(self, parent, initial_position, db_connection, username, on_success=None):
+    def __init__(self, parent, initial_position, username, on_success=None):
         self.parent = parent
-        self.db_conn = db_connection
         self.username = username
         self.on_success = on_success
-        self.pokemon_images = {}
+        self.refdata = None
+        self.executor = get_executor(parent)
+        self.jobs = JobGroup()  # Queries still running for this window
 
         self.window = tk.Toplevel(parent)
         self.window.title("Add New Shiny Pokémon")
@@ -19,10 +21,7 @@ class AddShinyWindow:
         self.window.resizable(False, False)
 
         self.create_widgets()
-        self.load_pokemon_list()
-        self.load_methods_list()
-        self.load_games_list()
-        self.load_balls_list()
+        self.load_reference_data()
 
         self.window.protocol("WM_DELETE_WINDOW", self.close)
         self.window.focus_set()
@@ -127,51 +126,68 @@ class AddShinyWindow:
 
         tk.Button(button_frame, text="Cancel", command=self.close,
                   font=('Arial', 12), width=10).pack(side='right', padx=10)
-        tk.Button(button_frame, text="Add Shiny", command=self.add_shiny,
-                  font=('Arial', 12, 'bold'), width=15).pack(side='right')
+        self.add_button = tk.Button(button_frame, text="Add Shiny", command=self.add_shiny,
+                                    font=('Arial', 12, 'bold'), width=15)
+        self.add_button.pack(side='right')
+
+        self.status_label = tk.Label(button_frame, text="", font=('Arial', 11), fg='gray')
+        self.status_label.pack(side='left')
 
         # Configure grid weights
         form_frame.columnconfigure(1, weight=1)
 
+    def set_busy(self, message):
+        """Show a loading/saving state, or clear it when message is None"""
+        busy = message is not None
+        self.status_label.config(text=message or "")
+        self.add_button.config(state='disabled' if busy else 'normal')
+        for combobox in (self.pokemon_combobox, self.game_combobox,
+                         self.method_combobox, self.ball_combobox):
+            combobox.config(state='disabled' if busy else 'normal')
+
+    def load_reference_data(self):
+        """Fill the form from the shared reference data (loaded in the background the first time)"""
+        cached = refcache.peek()
+        if cached:
+            self.on_reference_data(cached)
+            return
+        self.set_busy("Loading…")
+        self.executor.submit(refcache.get_reference_data,
+                             on_success=self.on_reference_data,
+                             on_error=self.on_reference_error,
+                             group=self.jobs)
+
+    def on_reference_data(self, refdata):
+        self.refdata = refdata
+        self.load_pokemon_list()
+        self.load_methods_list()
+        self.load_games_list()
+        self.load_balls_list()
+        self.set_busy(None)
+
+    def on_reference_error(self, error):
+        self.set_busy(None)
+        messagebox.showerror("Error", f"Could not load reference data:\n{str(error)}")
+
     def load_pokemon_list(self):
-        """Load all Pokémon from database into combobox"""
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT pokemonname FROM pokedex ORDER BY dexnr")
-            pokemon_list = [row[0] for row in cursor.fetchall()]
-            self.pokemon_combobox['values'] = pokemon_list
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load Pokémon list:\n{str(e)}")
+        """Fill the Pokémon combobox from the reference cache"""
+        if self.refdata:
+            self.pokemon_combobox['values'] = self.refdata.pokemon.names
 
     def load_methods_list(self):
-        """Load all hunting methods from database into combobox"""
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT methodname FROM huntingmethod ORDER BY methodname")
-            methods_list = [row[0] for row in cursor.fetchall()]
-            self.method_combobox['values'] = methods_list
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load methods list:\n{str(e)}")
+        """Fill the hunting method combobox from the reference cache"""
+        if self.refdata:
+            self.method_combobox['values'] = self.refdata.methods.names
 
     def load_games_list(self):
-        """Load all games from database into combobox"""
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT gamename FROM game ORDER BY gamename")
-            games_list = [row[0] for row in cursor.fetchall()]
-            self.game_combobox['values'] = games_list
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load games list:\n{str(e)}")
+        """Fill the game combobox from the reference cache"""
+        if self.refdata:
+            self.game_combobox['values'] = self.refdata.games.names
 
     def load_balls_list(self):
-        """Load all Poké Balls from database into combobox"""
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("SELECT ballname FROM pokeball ORDER BY ballname")
-            balls_list = [row[0] for row in cursor.fetchall()]
-            self.ball_combobox['values'] = balls_list
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load Poké Balls list:\n{str(e)}")
+        """Fill the Poké Ball combobox from the reference cache"""
+        if self.refdata:
+            self.ball_combobox['values'] = self.refdata.balls.names
 
     def update_pokemon_image(self, event=None):
         """Update the Pokémon image preview when selection changes"""
@@ -179,24 +195,7 @@ class AddShinyWindow:
         if not pokemon_name:
             return
 
-        if pokemon_name in self.pokemon_images:
-            img = self.pokemon_images[pokemon_name]
-        else:
-            try:
-                # Try to load from images folder
-                image_path = os.path.join("images", "pokemon", f"{pokemon_name.lower()}.png")
-                img = Image.open(image_path)
-                img = img.resize((150, 150), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                self.pokemon_images[pokemon_name] = photo
-            except Exception as e:
-                # Fallback if image not found
-                fallback_img = Image.new('RGBA', (150, 150), (255, 255, 255, 0))
-                draw = ImageDraw.Draw(fallback_img)
-                draw.text((10, 65), pokemon_name, fill="black", font=ImageFont.load_default())
-                photo = ImageTk.PhotoImage(fallback_img)
-                self.pokemon_images[pokemon_name] = photo
-
+        photo = get_sprite_cache().get_photo(pokemon_name, size=150)
         self.pokemon_img_label.config(image=photo)
         self.pokemon_img_label.image = photo  # Keep reference
 
@@ -218,58 +217,63 @@ class AddShinyWindow:
         if not self.date_entry.get():
             messagebox.showerror("Error", "Please enter a date")
             return
+        if not self.refdata:
+            messagebox.showerror("Error", "Reference data is not loaded")
+            return
+
+        # Catch typos here; the database resolves the names to IDs itself
+        lookups = (
+            ("Pokémon", self.refdata.pokemon, self.pokemon_var),
+            ("game", self.refdata.games, self.game_var),
+            ("method", self.refdata.methods, self.method_var),
+            ("Poké Ball", self.refdata.balls, self.ball_var),
+        )
+        for label, table, var in lookups:
+            if var.get() not in table:
+                messagebox.showerror("Error", f"Unknown {label}: {var.get()}")
+                return
 
         try:
-            cursor = self.db_conn.cursor()
-
-            # Get IDs for foreign keys
-            cursor.execute("SELECT dexnr FROM pokedex WHERE pokemonname = ?", (self.pokemon_var.get(),))
-            pokemon_id = cursor.fetchone()[0]
-
-            cursor.execute("SELECT gameld FROM game WHERE gamename = ?", (self.game_var.get(),))
-            game_id = cursor.fetchone()[0]
-
-            cursor.execute("SELECT methodId FROM huntingmethod WHERE methodname = ?", (self.method_var.get(),))
-            method_id = cursor.fetchone()[0]
-
-            cursor.execute("SELECT ballnr FROM pokeball WHERE ballname = ?", (self.ball_var.get(),))
-            ball_id = cursor.fetchone()[0]
-
-            # Insert the new shiny
-            cursor.execute("""
-                INSERT INTO caughtshiny (
-                    pokemon, gender, nickname, pokeball, username, otname,
-                    game_caught, method, date_caught, time_caught, encounters,
-                    video_link, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                pokemon_id,
-                self.gender_var.get(),
-                self.nickname_entry.get() or None,
-                ball_id,
-                self.username,
-                self.otname_entry.get(),
-                game_id,
-                method_id,
-                self.date_entry.get(),
-                self.time_entry.get() or None,
-                int(self.encounters_entry.get()),
-                self.video_entry.get() or None,
-                self.notes_text.get("1.0", "end-1c") or None
-            ))
-
-            self.db_conn.commit()
-            messagebox.showinfo("Success", "Shiny Pokémon added successfully!")
-
-            if self.on_success:
-                self.on_success()  # Refresh the collection view
-
-            self.close()
-
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not add shiny Pokémon:\n{str(e)}")
-            self.db_conn.rollback()
+            encounters = int(self.encounters_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Encounters must be a whole number")
+            return
+
+        shiny = dict(
+            pokemon=self.pokemon_var.get(),
+            game=self.game_var.get(),
+            method=self.method_var.get(),
+            ball=self.ball_var.get(),
+            username=self.username,
+            gender=self.gender_var.get(),
+            nickname=self.nickname_entry.get() or None,
+            otname=self.otname_entry.get(),
+            date_caught=self.date_entry.get(),
+            time_caught=self.time_entry.get() or None,
+            encounters=encounters,
+            video_link=self.video_entry.get() or None,
+            notes=self.notes_text.get("1.0", "end-1c") or None
+        )
+
+        self.set_busy("Saving…")
+        self.executor.submit(lambda conn: queries.add_shiny_by_name(conn, **shiny),
+                             on_success=self.on_added,
+                             on_error=self.on_add_error,
+                             group=self.jobs)
+
+    def on_added(self, result):
+        messagebox.showinfo("Success", "Shiny Pokémon added successfully!")
+
+        if self.on_success:
+            self.on_success()  # Refresh the collection view
+
+        self.close()
+
+    def on_add_error(self, error):
+        self.set_busy(None)
+        messagebox.showerror("Database Error", f"Could not add shiny Pokémon:\n{str(error)}")
 
     def close(self):
-        """Close the window"""
+        """Close the window, dropping results of any query still running"""
+        self.jobs.cancel_all()
         self.window.destroy()
\ No newline at end of file
@@ -1,8 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import bcrypt
-import pyodbc
-from db import dbconnection as dbc
+from db.executor import get_executor, JobGroup
+from authservice import AuthError, ValidationError, get_auth_service
+import sessions
 
 
 class AuthWindow:
@@ -14,7 +14,9 @@ class AuthWindow:
         self.window.title("Authentication")
         self.window.geometry(f"400x500+{initial_position[0]}+{initial_position[1]}")
         self.window.resizable(False, False)
-        self.conn = None
+        self.executor = get_executor(parent)
+        self.service = get_auth_service()
+        self.jobs = JobGroup()  # Queries still running for this window
 
         self.create_notebook()
         self.window.protocol("WM_DELETE_WINDOW", self.cleanup)
@@ -47,9 +49,10 @@ class AuthWindow:
         self.login_pass = tk.Entry(frame, show="*")
         self.login_pass.pack(pady=5, padx=20, fill='x')
 
-        tk.Button(frame, text="Login",
-                  command=self.attempt_login,
-                  width=15).pack(pady=20)
+        self.login_button = tk.Button(frame, text="Login",
+                                      command=self.attempt_login,
+                                      width=15)
+        self.login_button.pack(pady=20)
 
     def create_signup_form(self, frame):
         """Signup form widgets"""
@@ -67,39 +70,10 @@ class AuthWindow:
         self.signup_confirm = tk.Entry(frame, show="*")
         self.signup_confirm.pack(pady=5, padx=20, fill='x')
 
-        tk.Button(frame, text="Sign Up",
-                  command=self.attempt_signup,
-                  width=15).pack(pady=20)
-
-    def hash_password(self, password: str) -> bytes:
-        """Hash a password with bcrypt"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-
-    def verify_password(self, password: str, hashed: bytes) -> bool:
-        """Verify password against stored hash"""
-        try:
-            # Handle both string and bytes input from database
-            if isinstance(hashed, str):
-                # Convert hex string back to bytes if needed
-                if hashed.startswith('\\x'):
-                    hashed = bytes.fromhex(hashed[2:])
-                else:
-                    hashed = hashed.encode('latin1')
-            return bcrypt.checkpw(password.encode('utf-8'), hashed)
-        except Exception as e:
-            print(f"Password verification error: {e}")
-            return False
-
-    def get_connection(self):
-        """Get database connection with error handling"""
-        if not self.conn:
-            try:
-                self.conn = dbc.get_db_connection()
-            except pyodbc.Error as e:
-                messagebox.showerror("Database Error",
-                                     f"Connection failed:\n{str(e)}")
-                raise
-        return self.conn
+        self.signup_button = tk.Button(frame, text="Sign Up",
+                                       command=self.attempt_signup,
+                                       width=15)
+        self.signup_button.pack(pady=20)
 
     def attempt_login(self):
         """Handle login attempt with hashed password verification"""
@@ -110,32 +84,27 @@ class AuthWindow:
             messagebox.showerror("Error", "Both fields are required")
             return
 
+        self.login_button.config(state='disabled')
+        # Not a database job: the service borrows a connection only for its statements,
+        # so bcrypt doesn't hold one (or a database worker) while it runs
+        self.executor.submit_call(self.service.login, username, password,
+                                  on_success=lambda token: self.finish_login(username, token),
+                                  on_error=self.on_error,
+                                  group=self.jobs)
+
+    def finish_login(self, username, token):
+        """Called on the Tk thread once the password has been checked"""
+        self.login_button.config(state='normal')
+        # Remembered so the next launch can skip the login
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(
-                "SELECT password FROM account WHERE username = ?",
-                (username,)
-            )
-            result = cursor.fetchone()
-
-            if not result:
-                messagebox.showerror("Error", "Invalid credentials")
-                return
-
-            stored_hash = result[0]
-            print(f"Debug: Stored hash type={type(stored_hash)}, value={stored_hash}")
-
-            if self.verify_password(password, stored_hash):
-                messagebox.showinfo("Success", f"Welcome {username}!")
-                self.logged_in = True  # Add this
-                self.current_user = username  # Add this
-                self.cleanup()
-            else:
-                messagebox.showerror("Error", "Invalid credentials")
-        except Exception as e:
-            messagebox.showerror("Database Error", str(e))
+            sessions.save_token(token)
+        except OSError as e:
+            messagebox.showwarning("Session", f"You are logged in, but the login could not be "
+                                              f"remembered for next time:\n{e}")
+        messagebox.showinfo("Success", f"Welcome {username}!")
+        self.logged_in = True  # Add this
+        self.current_user = username  # Add this
+        self.cleanup()
 
     def attempt_signup(self):
         """Handle account creation with password hashing"""
@@ -147,54 +116,38 @@ class AuthWindow:
             messagebox.showerror("Error", "All fields are required")
             return
 
-        if len(username) < 4:
-            messagebox.showerror("Error", "Username must be at least 4 characters")
-            return
-
-        if len(password) < 8:
-            messagebox.showerror("Error", "Password must be at least 8 characters")
+        try:
+            self.service.validate(username, password)
+        except ValidationError as e:
+            messagebox.showerror("Error", str(e))
             return
 
         if password != confirm:
             messagebox.showerror("Error", "Passwords do not match")
             return
 
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
-            # Check if username exists
-            cursor.execute(
-                "SELECT username FROM account WHERE username = ?",
-                (username,)
-            )
-            if cursor.fetchone():
-                messagebox.showerror("Error", "Username already exists")
-                return
-
-            # Hash password and store
-            hashed_pw = self.hash_password(password)
-            print(f"Debug: New hash to store: {hashed_pw}")
-
-            cursor.execute(
-                "INSERT INTO account (username, password) VALUES (?, ?)",
-                (username, hashed_pw)
-            )
-            conn.commit()
-            messagebox.showinfo("Success", "Account created successfully!")
-            self.cleanup()
-        except Exception as e:
-            messagebox.showerror("Database Error", str(e))
-            if conn:
-                conn.rollback()
+        self.signup_button.config(state='disabled')
+        self.executor.submit_call(self.service.signup, username, password,
+                                  on_success=self.finish_signup,
+                                  on_error=self.on_error,
+                                  group=self.jobs)
+
+    def finish_signup(self, _):
+        self.signup_button.config(state='normal')
+        messagebox.showinfo("Success", "Account created successfully!")
+        self.cleanup()
+
+    def on_error(self, error):
+        self.login_button.config(state='normal')
+        self.signup_button.config(state='normal')
+        if isinstance(error, AuthError):
+            messagebox.showerror("Error", str(error))
+        else:
+            messagebox.showerror("Database Error", str(error))
 
     def cleanup(self):
         """Clean up resources"""
-        if hasattr(self, 'conn') and self.conn:
-            try:
-                self.conn.close()
-            except:
-                pass
+        self.jobs.cancel_all()
         self.window.destroy()
 
     def close(self):
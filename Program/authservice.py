@@ -0,0 +1,156 @@
+import threading
+from contextlib import contextmanager
+from db import dbconnection as dbc
+from passwords import get_password_service
+import sessions
+
+MIN_USERNAME_LENGTH = 4
+MAX_USERNAME_LENGTH = 20  # account.username is varchar(20)
+MIN_PASSWORD_LENGTH = 8
+
+
+class AuthError(Exception):
+    """Base class for failures the user should be told about"""
+
+
+class ValidationError(AuthError):
+    """Username or password doesn't meet the rules"""
+
+
+class UsernameTaken(AuthError):
+    def __init__(self, username):
+        super().__init__("Username already exists")
+        self.username = username
+
+
+class InvalidCredentials(AuthError):
+    def __init__(self):
+        super().__init__("Invalid credentials")
+
+
+class AuthService:
+    """Account logic without any UI: signup, login, sessions and password changes.
+
+    Every method takes an optional conn. Without one it borrows pooled
+    connections only for the statements themselves, never while bcrypt runs;
+    a DbExecutor job can pass its own connection instead.
+    """
+
+    def __init__(self, passwords=None, connect=None):
+        self.passwords = passwords or get_password_service()
+        self._connect = connect or dbc.get_db_connection
+        self._dummy_hash = None
+
+    @contextmanager
+    def _connection(self, conn):
+        if conn is not None:
+            yield conn
+            return
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def validate(self, username, password):
+        if len(username) < MIN_USERNAME_LENGTH:
+            raise ValidationError(f"Username must be at least {MIN_USERNAME_LENGTH} characters")
+        if len(username) > MAX_USERNAME_LENGTH:
+            raise ValidationError(f"Username can be at most {MAX_USERNAME_LENGTH} characters")
+        self.validate_password(password)
+
+    def validate_password(self, password):
+        if len(password) < MIN_PASSWORD_LENGTH:
+            raise ValidationError(f"Password must be at least {MIN_PASSWORD_LENGTH} characters")
+
+    def signup(self, username, password, conn=None):
+        """Create an account. Raises ValidationError or UsernameTaken."""
+        self.validate(username, password)
+        hashed_pw = self.passwords.hash(password)
+        with self._connection(conn) as conn:
+            cursor = conn.cursor()
+            try:
+                # pk_account decides who wins when two signups race for a name
+                cursor.execute(
+                    "INSERT INTO account (username, password) VALUES (?, ?)",
+                    (username, hashed_pw)
+                )
+                conn.commit()
+            except dbc.get_backend().integrity_errors():
+                conn.rollback()
+                raise UsernameTaken(username) from None
+
+    def _fetch_hash(self, conn, username):
+        cursor = conn.cursor()
+        cursor.execute("SELECT password FROM account WHERE username = ?", (username,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _check_password(self, username, password, conn):
+        """Stored hash if the password matches, else raise InvalidCredentials"""
+        with self._connection(conn) as c:
+            stored_hash = self._fetch_hash(c, username)
+        if stored_hash is None:
+            # Spend the same time as a real check so unknown names don't stand out
+            if self._dummy_hash is None:
+                self._dummy_hash = self.passwords.hash("not a real password")
+            self.passwords.verify(password, self._dummy_hash)
+            raise InvalidCredentials()
+        ok, new_hash = self.passwords.verify_and_update(password, stored_hash)
+        if not ok:
+            raise InvalidCredentials()
+        if new_hash is not None:
+            with self._connection(conn) as c:
+                self._replace_hash(c, username, stored_hash, new_hash)
+            stored_hash = new_hash
+        return stored_hash
+
+    def _replace_hash(self, conn, username, old_hash, new_hash):
+        """Swap the hash unless the password changed in the meantime; commits"""
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE account SET password = ? WHERE username = ? AND password = ?",
+            (new_hash, username, old_hash)
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+
+    def login(self, username, password, conn=None):
+        """Check the password and start a session; returns its token. Raises InvalidCredentials."""
+        self._check_password(username, password, conn)
+        with self._connection(conn) as c:
+            return sessions.create_session(c, username)
+
+    def change_password(self, username, old_password, new_password, conn=None):
+        """Set a new password, log out every other session and return a fresh token"""
+        self.validate_password(new_password)
+        stored_hash = self._check_password(username, old_password, conn)
+        new_hash = self.passwords.hash(new_password)
+        with self._connection(conn) as c:
+            if not self._replace_hash(c, username, stored_hash, new_hash):
+                raise AuthError("Password was changed elsewhere, please try again")
+            sessions.revoke_all_sessions(c, username)
+            return sessions.create_session(c, username)
+
+    def resume(self, token, conn=None):
+        """Username for a remembered session, or None"""
+        with self._connection(conn) as c:
+            return sessions.resume_session(c, token)
+
+    def logout(self, token, conn=None):
+        with self._connection(conn) as c:
+            sessions.revoke_session(c, token)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_auth_service():
+    """Process-wide AuthService on the shared pool"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = AuthService()
+    return _service
@@ -0,0 +1 @@
+"""Micro-benchmarks, run from the Program folder as `python -m benchmarks.<name>`"""
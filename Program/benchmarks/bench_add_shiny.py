@@ -0,0 +1,83 @@
+"""Adding a shiny: four lookups + insert (the old path) vs add_shiny_by_name.
+
+    python -m benchmarks.bench_add_shiny [--count 500] [--rtt-ms 1]
+
+--rtt-ms adds a simulated network round trip to every statement and commit
+(1 ms by default, like a server on the local network), which is where fewer
+statements per add pay off; --rtt-ms 0 measures SQLite alone.
+"""
+import argparse
+import time
+
+from db import dbconnection as dbc
+from db import instrument
+from db import queries
+from db import stats
+
+from .common import latency_line, use_sqlite
+
+SHINY = dict(pokemon="Pikachu", game="Pokémon Scarlet", method="Gen 9 Wild (No Charm)",
+             ball="Poké Ball", gender="Male", otname="Ash", date_caught="2024-01-01",
+             time_caught="12:00:00", encounters=4096)
+
+
+def legacy_add(conn, username):
+    """What AddShinyWindow used to do: resolve every name with its own query, then insert"""
+    cursor = conn.cursor()
+    ids = []
+    for sql, name in (("SELECT dexnr FROM pokedex WHERE pokemonname = ?", SHINY['pokemon']),
+                      ("SELECT gameid FROM game WHERE gamename = ?", SHINY['game']),
+                      ("SELECT methodid FROM huntingmethod WHERE methodname = ?", SHINY['method']),
+                      ("SELECT ballnr FROM pokeball WHERE ballname = ?", SHINY['ball'])):
+        cursor.execute(sql, (name,))
+        ids.append(cursor.fetchone()[0])
+    pokemon, game, method, ball = ids
+    cursor.execute("SELECT COALESCE(MAX(shinyid), 0) + 1 FROM caughtshiny")
+    shinyid = cursor.fetchone()[0]
+    cursor.execute("""
+        INSERT INTO caughtshiny (shinyid, pokemon, gender, nickname, pokeball, username, otname,
+                                 game_caught, method, date_caught, time_caught, encounters,
+                                 video_link, notes)
+        VALUES (?, ?, ?, NULL, ?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL)
+    """, (shinyid, pokemon, SHINY['gender'], ball, username, SHINY['otname'], game, method,
+          SHINY['date_caught'], SHINY['time_caught'], SHINY['encounters']))
+    stats.record_insert(cursor, username, game, method, ball, SHINY['encounters'])
+    conn.commit()
+
+
+def single_add(conn, username):
+    queries.add_shiny_by_name(conn, username=username, **SHINY)
+
+
+def run(label, add, username, count):
+    samples = []
+    instrument.query_stats.reset()
+    for _ in range(count):
+        with dbc.get_db_connection() as conn:
+            started = time.perf_counter()
+            add(conn, username)
+            samples.append(time.perf_counter() - started)
+    statements = sum(row['count'] for row in instrument.query_stats.snapshot())
+    print(latency_line(label, samples) + f"   {statements / count:.1f} statements/add")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=1.0,
+                        help="Simulated round-trip time per statement")
+    args = parser.parse_args(argv)
+
+    dbc.INSTRUMENT = True
+    use_sqlite(rtt_ms=args.rtt_ms)
+    with dbc.get_db_connection() as conn:
+        conn.cursor().execute("INSERT INTO account VALUES ('bench', 'x')")
+        conn.commit()
+
+    print(f"{args.count} adds, simulated rtt {args.rtt_ms} ms")
+    run("lookups + insert", legacy_add, "bench", args.count)
+    run("add_shiny_by_name", single_add, "bench", args.count)
+
+
+if __name__ == "__main__":
+    main()
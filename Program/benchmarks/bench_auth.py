@@ -0,0 +1,63 @@
+"""Concurrent signups and logins through AuthService.
+
+    python -m benchmarks.bench_auth [--users 50] [--threads 8] [--rounds 4]
+
+Every name is signed up twice at the same time, so exactly one of each pair
+must win via pk_account and the other must get UsernameTaken.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from authservice import AuthService, UsernameTaken
+from passwords import PasswordService
+
+from .common import latency_line, use_sqlite
+
+PASSWORD = "hunter2hunter2"
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    try:
+        fn(*args)
+        outcome = "ok"
+    except UsernameTaken:
+        outcome = "taken"
+    return outcome, time.perf_counter() - started
+
+
+def run(label, pool, fn, args_list):
+    started = time.perf_counter()
+    results = list(pool.map(lambda args: timed(fn, *args), args_list))
+    elapsed = time.perf_counter() - started
+    print(latency_line(label, [t for _, t in results]) + f"   {len(results) / elapsed:8.1f}/s")
+    return [outcome for outcome, _ in results]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost")
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    # A file database: SQLite's shared in-memory mode serializes too coarsely for this
+    path = os.path.join(tempfile.mkdtemp(), "bench_auth.sqlite3")
+    use_sqlite(path, rtt_ms=args.rtt_ms, max_size=args.threads)
+    service = AuthService(passwords=PasswordService(rounds=args.rounds, workers=args.threads))
+    names = [f"user{i:04d}" for i in range(args.users)]
+
+    print(f"{args.users} users, {args.threads} threads, bcrypt cost {args.rounds}")
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        outcomes = run("signup (2x per name)", pool, service.signup,
+                       [(name, PASSWORD) for name in names for _ in range(2)])
+        print(f"{'':<28} {outcomes.count('ok')} created, {outcomes.count('taken')} rejected as taken")
+        run("login", pool, service.login, [(name, PASSWORD) for name in names])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""bcrypt verify latency per cost factor, alone and under concurrent logins.
+
+    python -m benchmarks.bench_passwords [--rounds 10 11 12 13] [--count 10] [--workers 2]
+
+Pick the highest cost whose p50 still feels instant at the login button
+(roughly 250 ms) and set POKEMON_SHINY_BCRYPT_ROUNDS to it.
+"""
+import argparse
+import time
+
+from passwords import PasswordService
+
+from .common import latency_line
+
+PASSWORD = "correct horse battery staple"
+
+
+def bench(rounds, count, workers):
+    service = PasswordService(rounds=rounds, workers=workers)
+    try:
+        stored = service.hash(PASSWORD)
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            service.verify(PASSWORD, stored)
+            samples.append(time.perf_counter() - started)
+        print(latency_line(f"cost {rounds} verify", samples))
+
+        # Many logins at once: throughput is bounded by the pool size
+        started = time.perf_counter()
+        futures = [service.verify_async(PASSWORD, stored) for _ in range(count * workers)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+        print(f"{'':<28} {len(futures) / elapsed:8.1f} verifies/s with {workers} workers")
+    finally:
+        service.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    for rounds in args.rounds:
+        bench(rounds, args.count, args.workers)
+
+
+if __name__ == "__main__":
+    main()
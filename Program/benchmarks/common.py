@@ -0,0 +1,65 @@
+import time
+
+from db import dbconnection as dbc
+from db.backends import SqliteBackend
+
+
+class LatencyCursor:
+    """Cursor that waits rtt seconds per statement, like a database across the network"""
+
+    def __init__(self, cursor, rtt):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, sql, *params):
+        time.sleep(self._rtt)
+        self._cursor.execute(sql, *params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        time.sleep(self._rtt)
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class LatencyConnection:
+    def __init__(self, conn, rtt):
+        self._conn = conn
+        self._rtt = rtt
+
+    def cursor(self):
+        return LatencyCursor(self._conn.cursor(), self._rtt)
+
+    def commit(self):
+        time.sleep(self._rtt)
+        self._conn.commit()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def use_sqlite(path=":memory:", rtt_ms=0.0, **pool_options):
+    """Point the app at a SQLite database, optionally with simulated round-trip latency"""
+    backend = SqliteBackend(path)
+    if rtt_ms:
+        pool_options['connect'] = lambda: LatencyConnection(backend.connect(), rtt_ms / 1000)
+    dbc.set_backend(backend, **pool_options)
+    return backend
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def latency_line(label, samples):
+    """'label  p50 / p95 / mean' in milliseconds"""
+    mean = sum(samples) / len(samples)
+    return (f"{label:<28} p50 {percentile(samples, 50) * 1000:8.2f} ms   "
+            f"p95 {percentile(samples, 95) * 1000:8.2f} ms   mean {mean * 1000:8.2f} ms")
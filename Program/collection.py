@@ -1,10 +1,19 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk, ImageDraw
-import os
+from tkinter import messagebox
 from auth import AuthWindow
 from addshiny import AddShinyWindow
-from db import dbconnection as dbc
+from db import queries
+from db import refcache
+from db import stats
+from db.executor import get_executor, JobGroup
+import sessions
+from spritelib import get_sprite_cache, get_sprite_loader, get_sprite_resolver
+from virtualgrid import VirtualGrid
+
+GRID_COLUMNS = 5
+TILE_WIDTH = 130  # Button (100 px + border) plus padding
+TILE_HEIGHT = 175  # Button (120 px), star label and padding
+TILE_IMAGE_SIZE = 100
 
 
 class CollectionPage:
@@ -13,7 +22,14 @@ class CollectionPage:
         self.on_close = on_close
         self.logged_in = logged_in
         self.current_user = current_user
-        self.pokemon_images = {}  # Cache for pokemon images
+        self.collection_grid = None
+        self.sprite_resolver = None  # Set once the reference data is loaded
+        self.page_cursor = None  # Keyset cursor for the next collection page
+        self.has_more_pages = False
+        self.loading_label = None
+        self.executor = get_executor(parent)
+        self.sprites = get_sprite_loader(parent)
+        self.jobs = JobGroup()  # Queries and sprite loads feeding the current content
 
         self.window = tk.Toplevel(parent)
         self.window.title("Collection Page")
@@ -79,6 +95,9 @@ class CollectionPage:
 
     def update_content(self):
         """Update content based on login state"""
+        # Results for the old content have nowhere to go any more
+        self.jobs.cancel_all()
+        self.jobs = JobGroup()
         for widget in self.content.winfo_children():
             widget.destroy()
 
@@ -87,6 +106,7 @@ class CollectionPage:
                      font=('Arial', 24)).pack(pady=20)
             tk.Label(self.content, text=f"Welcome back, {self.current_user}!",
                      font=('Arial', 14)).pack(pady=10)
+            self.show_stats_summary()
             self.show_collection_items()
         else:
             tk.Label(self.content, text="Pokémon Collection",
@@ -94,120 +114,114 @@ class CollectionPage:
             tk.Label(self.content, text="Please login to view your shiny collection",
                      font=('Arial', 14)).pack(pady=10)
 
-    def get_pokemon_image(self, pokemon_name):
-        """Load and cache pokemon images"""
-        if pokemon_name in self.pokemon_images:
-            return self.pokemon_images[pokemon_name]
-
-        try:
-            # Try to load from images folder (adjust path as needed)
-            image_path = os.path.join("images", "pokemon", f"{pokemon_name.lower()}.png")
-            img = Image.open(image_path)
-            img = img.resize((100, 100), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-            self.pokemon_images[pokemon_name] = photo
-            return photo
-        except:
-            # Fallback if image not found
-            fallback_img = Image.new('RGBA', (100, 100), (255, 255, 255, 0))
-            draw = ImageDraw.Draw(fallback_img)
-            draw.text((10, 40), pokemon_name, fill="black")
-            photo = ImageTk.PhotoImage(fallback_img)
-            self.pokemon_images[pokemon_name] = photo
-            return photo
-
     def show_collection_items(self):
-        """Display the user's collection as image buttons"""
-        try:
-            conn = dbc.get_db_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT 
-                    cs.shinyid,
-                    pb.pokemonname,
-                    cs.gender,
-                    cs.nickname,
-                    pball.ballname,
-                    cs.username,
-                    cs.otname,
-                    g.gamename,
-                    hm.methodname,
-                    cs.date_caught,
-                    cs.time_caught,
-                    cs.encounters,
-                    cs.video_link,
-                    cs.notes
-                FROM caughtshiny cs
-                JOIN pokedex pb ON cs.pokemon = pb.dexnr
-                JOIN pokeball pball ON cs.pokeball = pball.ballnr
-                JOIN game g ON cs.game_caught = g.gameid
-                JOIN huntingmethod hm ON cs.method = hm.methodId
-                WHERE cs.username = ?
-                ORDER BY cs.date_caught DESC, cs.time_caught DESC
-            """, (self.current_user,))
-
-            # Create a scrollable canvas
-            container = tk.Frame(self.content)
-            container.pack(fill='both', expand=True)
-
-            canvas = tk.Canvas(container)
-            scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-            scrollable_frame = tk.Frame(canvas)
-
-            scrollable_frame.bind(
-                "<Configure>",
-                lambda e: canvas.configure(
-                    scrollregion=canvas.bbox("all")
-                )
-            )
+        """Display the user's collection as a virtual grid of image buttons, loaded page by page"""
+        self.loading_label = tk.Label(self.content, text="", font=('Arial', 11), fg='gray')
+        self.loading_label.pack(side='bottom')
+
+        self.collection_grid = VirtualGrid(
+            self.content,
+            columns=GRID_COLUMNS,
+            tile_width=TILE_WIDTH,
+            tile_height=TILE_HEIGHT,
+            create_tile=self.create_tile,
+            update_tile=self.update_tile,
+            on_need_more=self.load_next_page
+        )
+        self.collection_grid.pack(fill='both', expand=True)
+
+        self.page_cursor = None
+        self.has_more_pages = False  # Until the sprite resolver is ready
+        # The count sizes the scrollbar before the first page arrives
+        self.executor.submit(queries.count_collection, self.current_user,
+                             on_success=self.collection_grid.set_total,
+                             group=self.jobs)
+        # Tiles need the game table to pick each catch's sprite
+        refdata = refcache.peek()
+        if refdata is not None:
+            self.on_reference_data(refdata)
+        else:
+            self.executor.submit(refcache.get_reference_data,
+                                 on_success=self.on_reference_data,
+                                 on_error=self.on_collection_error,
+                                 group=self.jobs)
+
+    def on_reference_data(self, refdata):
+        self.sprite_resolver = get_sprite_resolver(refdata)
+        self.has_more_pages = True
+        self.load_next_page()
+
+    def create_tile(self, parent):
+        """One reusable grid tile: image button plus the shiny star"""
+        tile = tk.Frame(parent, padx=5, pady=5)
+        tile.button = tk.Button(
+            tile,
+            compound='top',
+            width=100,
+            height=120,
+            font=('Arial', 10)
+        )
+        tile.button.pack()
+        tile.sprite_request = None
+        # Add shiny star indicator
+        tk.Label(tile, text="⭐", font=('Arial', 10)).pack()
+        return tile
+
+    def update_tile(self, tile, shiny):
+        """Show shiny on a (possibly recycled) tile; None means its page is still loading"""
+        if tile.sprite_request is not None:
+            # Whatever this tile was waiting for has scrolled away
+            tile.sprite_request.cancel()
+            tile.sprite_request = None
+
+        if shiny is None:
+            tile.button.config(image='', text="Loading…", command='')
+            tile.button.image = None
+            return
 
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-
-            canvas.pack(side="left", fill="both", expand=True)
-            scrollbar.pack(side="right", fill="y")
-
-            # Display pokemon as image buttons in a grid
-            row, col = 0, 0
-            max_cols = 5  # Number of columns in the grid
-
-            for shiny in cursor.fetchall():
-                shinyid, pokemon, gender, nickname, ballname, username, otname, gamename, methodname, \
-                    date_caught, time_caught, encounters, video_link, notes = shiny
-
-                # Get pokemon image
-                img = self.get_pokemon_image(pokemon)
-
-                # Create button with image and name
-                btn_frame = tk.Frame(scrollable_frame, padx=5, pady=5)
-                btn_frame.grid(row=row, column=col, padx=5, pady=5)
-
-                btn = tk.Button(
-                    btn_frame,
-                    image=img,
-                    compound='top',
-                    text=nickname if nickname else pokemon,
-                    command=lambda s=shiny: self.show_shiny_details(s),
-                    width=100,
-                    height=120,
-                    font=('Arial', 10)
-                )
-                btn.image = img  # Keep reference to prevent garbage collection
-                btn.pack()
-
-                # Add shiny star indicator
-                tk.Label(btn_frame, text="⭐", font=('Arial', 10)).pack()
-
-                # Update grid position
-                col += 1
-                if col >= max_cols:
-                    col = 0
-                    row += 1
-
-            conn.close()
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not load collection:\n{str(e)}")
+        pokemon, nickname, gamename = shiny[1], shiny[3], shiny[7]
+        img, tile.sprite_request = self.sprites.load(
+            pokemon, on_ready=lambda photo: self.set_tile_image(tile, photo),
+            size=TILE_IMAGE_SIZE, group=self.jobs,
+            **self.sprite_resolver.sprite_args(pokemon, gamename)
+        )
+        if img is None:
+            img = get_sprite_cache().placeholder_photo(TILE_IMAGE_SIZE)
+        tile.button.config(image=img,
+                           text=nickname if nickname else pokemon,
+                           command=lambda s=shiny: self.show_shiny_details(s))
+        tile.button.image = img  # Keep reference to prevent garbage collection
+
+    def set_tile_image(self, tile, photo):
+        """Swap the decoded sprite in for the placeholder"""
+        tile.sprite_request = None
+        tile.button.config(image=photo)
+        tile.button.image = photo
+
+    def load_next_page(self):
+        """Fetch the next page of the collection in the background"""
+        if not self.has_more_pages or not self.collection_grid.frame.winfo_exists():
+            return
+        self.has_more_pages = False  # Guards against double loads while this one runs
+
+        self.loading_label.config(text="Loading…")
+        self.executor.submit(queries.fetch_collection_page, self.current_user, self.page_cursor,
+                             on_success=self.add_collection_page,
+                             on_error=self.on_collection_error,
+                             group=self.jobs)
+
+    def on_collection_error(self, error):
+        self.loading_label.config(text="")
+        messagebox.showerror("Database Error", f"Could not load collection:\n{str(error)}")
+
+    def add_collection_page(self, result):
+        """Hand a fetched page to the grid; it asks for the next one while slots in view are empty"""
+        rows, self.page_cursor = result
+        self.loading_label.config(text="")
+        # Paging follows the keyset cursor, not the count: the running total
+        # may be off (e.g. before a stats rebuild)
+        self.has_more_pages = self.page_cursor is not None
+        self.collection_grid.extend(rows, more=self.has_more_pages)
 
     def show_shiny_details(self, shiny):
         """Show a detailed popup for the selected shiny"""
@@ -226,16 +240,11 @@ class CollectionPage:
         header_frame = tk.Frame(main_frame)
         header_frame.pack(fill='x', pady=10)
 
-        try:
-            img_path = os.path.join("recources", "PNG", "sprites","pokedb","scarlet-violet","normal",f"{pokemon.lower()}.png")
-            img = Image.open(img_path)
-            img = img.resize((150, 150), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-            img_label = tk.Label(header_frame, image=photo)
-            img_label.image = photo
-            img_label.pack(side='left', padx=10)
-        except:
-            pass
+        photo = get_sprite_cache().get_photo(pokemon, size=150,
+                                             **self.sprite_resolver.sprite_args(pokemon, gamename))
+        img_label = tk.Label(header_frame, image=photo)
+        img_label.image = photo
+        img_label.pack(side='left', padx=10)
 
         name_frame = tk.Frame(header_frame)
         name_frame.pack(side='left', fill='y', padx=10)
@@ -299,6 +308,56 @@ class CollectionPage:
         tk.Button(main_frame, text="Close", command=details_window.destroy,
                   font=('Arial', 12), width=15).pack(pady=10)
 
+    def show_stats_summary(self):
+        """One-line hunting summary; click it for the full breakdown"""
+        self.stats_label = tk.Label(self.content, text="", font=('Arial', 11),
+                                    fg='gray', cursor='hand2')
+        self.stats_label.pack()
+        self.stats_label.bind("<Button-1>", lambda e: self.show_stats_details())
+        self.user_stats = None
+        self.executor.submit(stats.get_user_stats, self.current_user,
+                             on_success=self.update_stats_summary,
+                             on_error=self.on_stats_error,
+                             group=self.jobs)
+
+    def update_stats_summary(self, user_stats):
+        self.user_stats = user_stats
+        text = f"{user_stats.total_shinies} shinies · {user_stats.total_encounters:,} encounters"
+        if user_stats.average_encounters is not None:
+            text += f" (avg {user_stats.average_encounters:,.0f})"
+        if user_stats.luck_ratio is not None:
+            text += f" · luck {user_stats.luck_ratio:.2f}× odds"
+        self.stats_label.config(text=text)
+
+    def on_stats_error(self, error):
+        self.stats_label.config(text=f"Could not load statistics: {error}", fg='red', cursor='')
+
+    def show_stats_details(self):
+        """Popup with the per game, method and ball breakdowns"""
+        if not self.user_stats:
+            return
+        details_window = tk.Toplevel(self.window)
+        details_window.title("Hunting Statistics")
+        details_window.geometry(f"500x600+{self.window.winfo_x() + 50}+{self.window.winfo_y() + 50}")
+
+        main_frame = tk.Frame(details_window, padx=20, pady=20)
+        main_frame.pack(fill='both', expand=True)
+        tk.Label(main_frame, text=self.stats_label.cget('text'),
+                 font=('Arial', 11), wraplength=440).pack(pady=5)
+
+        for dimension, title in (('game', "By Game"), ('method', "By Method"), ('ball', "By Poké Ball")):
+            frame = tk.LabelFrame(main_frame, text=title, padx=10, pady=5)
+            frame.pack(fill='x', pady=5)
+            rows = self.user_stats.breakdown[dimension]
+            if not rows:
+                tk.Label(frame, text="Nothing yet", font=('Arial', 10)).pack(anchor='w')
+            for name, shinies, encounters in rows[:8]:
+                tk.Label(frame, text=f"{name}: {shinies} shinies, {encounters:,} encounters",
+                         font=('Arial', 10), anchor='w').pack(fill='x')
+
+        tk.Button(main_frame, text="Close", command=details_window.destroy,
+                  font=('Arial', 12), width=15).pack(pady=10)
+
     def open_link(self, url):
         """Helper function to open URLs"""
         import webbrowser
@@ -311,19 +370,18 @@ class CollectionPage:
             return
 
         try:
-            conn = dbc.get_db_connection()
+            # The form loads its own data in the background
             AddShinyWindow(
                 parent=self.window,
                 initial_position=(
                     self.window.winfo_x() + 50,
                     self.window.winfo_y() + 50
                 ),
-                db_connection=conn,
                 username=self.current_user,
                 on_success=self.update_content  # Refresh after adding
             )
         except Exception as e:
-            messagebox.showerror("Database Error", f"Could not connect to database:\n{str(e)}")
+            messagebox.showerror("Error", f"Could not open the Add Shiny window:\n{str(e)}")
 
     def show_auth(self):
         """Show authentication window"""
@@ -344,6 +402,10 @@ class CollectionPage:
 
     def logout(self):
         """Handle logout"""
+        token = sessions.load_token()
+        if token:
+            sessions.forget_token()
+            self.executor.submit(sessions.revoke_session, token)
         self.logged_in = False
         self.current_user = None
         self.update_auth_buttons()
@@ -352,6 +414,7 @@ class CollectionPage:
 
     def close(self):
         """Close the window and return state to main menu"""
+        self.jobs.cancel_all()
         pos = (self.window.winfo_x(), self.window.winfo_y())
         self.window.destroy()
         self.on_close(pos, self.logged_in, self.current_user)
\ No newline at end of file
@@ -77,3 +77,46 @@ create table caughtshiny(
     constraint fk_caughtshiny_method foreign key (method) references huntingmethod(methodid)
 );
 
+
+-- Keyset paging of a user's collection (newest first); covers the collection query
+create index ix_caughtshiny_user_caught
+    on caughtshiny (username, date_caught, time_caught, shinyid)
+    include (pokemon, gender, nickname, pokeball, otname, game_caught, method, encounters, video_link, notes);
+
+-- Running totals per user, kept up to date by db/stats.py on every insert/delete
+create table userstats(
+    username varchar(20) not null,
+    total_shinies int not null default 0,
+    total_encounters bigint not null default 0,
+    counted_shinies int not null default 0,  -- shinies with a known encounter count
+    luck_sum float not null default 0,  -- sum of encounters / baseodds
+    
+    constraint pk_userstats primary key (username),
+    constraint fk_userstats_account foreign key (username) references account(username)
+);
+
+-- Same totals split by game, method or ball (itemid 0 = no ball recorded)
+create table userstats_breakdown(
+    username varchar(20) not null,
+    dimension varchar(10) not null,
+    itemid int not null,
+    shinies int not null default 0,
+    encounters bigint not null default 0,
+    
+    constraint pk_userstats_breakdown primary key (username, dimension, itemid),
+    constraint fk_userstats_breakdown_account foreign key (username) references account(username)
+);
+
+-- Remembered logins; only a SHA-256 of the token is stored (see sessions.py)
+create table usersession(
+    tokenhash char(64) not null,
+    username varchar(20) not null,
+    created_at bigint not null,  -- unix seconds
+    expires_at bigint not null,
+    revoked bit not null default 0,
+    
+    constraint pk_usersession primary key (tokenhash),
+    constraint fk_usersession_account foreign key (username) references account(username)
+);
+
+create index ix_usersession_username on usersession (username);
@@ -0,0 +1,117 @@
+use PokemonShiny
+go
+
+-- Adds a shiny in one round trip: resolves the names, assigns the next shinyid,
+-- keeps userstats/userstats_breakdown in step and returns the new collection row.
+-- db/queries.py add_shiny_by_name() has the SQLite equivalent.
+create or alter procedure add_caughtshiny
+    @pokemonname varchar(max),
+    @gamename varchar(max),
+    @methodname varchar(max),
+    @ballname varchar(max),
+    @username varchar(20),
+    @gender varchar(max),
+    @nickname varchar(max),
+    @otname varchar(20),
+    @date_caught date,
+    @time_caught time,
+    @encounters int,
+    @video_link varchar(50),
+    @notes varchar(50)
+as
+begin
+    set nocount on;
+    set xact_abort on;
+
+    declare @new table (
+        shinyid bigint,
+        game_caught int,
+        method int,
+        pokeball int
+    );
+
+    if @ballname is not null and not exists (select 1 from pokeball where ballname = @ballname)
+        throw 50002, 'Unknown Poke Ball', 1;
+
+    begin transaction;
+
+    insert into caughtshiny (
+        shinyid, pokemon, gender, nickname, pokeball, username, otname,
+        game_caught, method, date_caught, time_caught, encounters,
+        video_link, notes
+    )
+    output inserted.shinyid, inserted.game_caught, inserted.method, inserted.pokeball
+        into @new (shinyid, game_caught, method, pokeball)
+    select
+        isnull((select max(shinyid) from caughtshiny with (updlock, holdlock)), 0) + 1,
+        p.dexnr, @gender, @nickname, b.ballnr, @username, @otname,
+        g.gameid, m.methodid, @date_caught, @time_caught, @encounters,
+        @video_link, @notes
+    from pokedex p
+    cross join game g
+    cross join huntingmethod m
+    left join pokeball b on b.ballname = @ballname
+    where p.pokemonname = @pokemonname
+      and g.gamename = @gamename
+      and m.methodname = @methodname;
+
+    if @@rowcount = 0
+    begin
+        rollback transaction;
+        throw 50001, 'Unknown Pokemon, game or method', 1;
+    end
+
+    declare @luck float = (
+        select cast(@encounters as float) / nullif(m.baseodds, 0)
+        from @new n join huntingmethod m on m.methodid = n.method
+    );
+
+    update userstats set
+        total_shinies = total_shinies + 1,
+        total_encounters = total_encounters + isnull(@encounters, 0),
+        counted_shinies = counted_shinies + case when @encounters is null then 0 else 1 end,
+        luck_sum = luck_sum + isnull(@luck, 0)
+    where username = @username;
+    if @@rowcount = 0
+        insert into userstats (username, total_shinies, total_encounters, counted_shinies, luck_sum)
+        values (@username, 1, isnull(@encounters, 0),
+                case when @encounters is null then 0 else 1 end, isnull(@luck, 0));
+
+    merge userstats_breakdown as t
+    using (
+        select 'game' as dimension, game_caught as itemid from @new
+        union all select 'method', method from @new
+        union all select 'ball', isnull(pokeball, 0) from @new
+    ) as s
+    on t.username = @username and t.dimension = s.dimension and t.itemid = s.itemid
+    when matched then
+        update set shinies = t.shinies + 1, encounters = t.encounters + isnull(@encounters, 0)
+    when not matched then
+        insert (username, dimension, itemid, shinies, encounters)
+        values (@username, s.dimension, s.itemid, 1, isnull(@encounters, 0));
+
+    commit transaction;
+
+    select
+        cs.shinyid,
+        pb.pokemonname,
+        cs.gender,
+        cs.nickname,
+        pball.ballname,
+        cs.username,
+        cs.otname,
+        g.gamename,
+        hm.methodname,
+        cs.date_caught,
+        cs.time_caught,
+        cs.encounters,
+        cs.video_link,
+        cs.notes
+    from @new n
+    join caughtshiny cs on cs.shinyid = n.shinyid
+    join pokedex pb on cs.pokemon = pb.dexnr
+    left join pokeball pball on cs.pokeball = pball.ballnr
+    join game g on cs.game_caught = g.gameid
+    join huntingmethod hm on cs.method = hm.methodid;
+end
+go
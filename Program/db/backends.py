@@ -0,0 +1,221 @@
+import os
+import re
+import sqlite3
+import threading
+
+DB_DIR = os.path.dirname(os.path.abspath(__file__))
+DDL_FILE = os.path.join(DB_DIR, "DDL.sql")
+INSERTS_FILE = os.path.join(DB_DIR, "INSERTS.sql")
+DEFAULT_SQLITE_PATH = os.path.join(DB_DIR, "PokemonShiny.sqlite3")
+
+
+class Backend:
+    """Where connections come from and which SQL dialect they speak"""
+    name = None
+    dialect = None
+
+    def connect(self):
+        raise NotImplementedError
+
+    def driver_errors(self):
+        """Exception types raised by the driver, for callers that catch them"""
+        return (Exception,)
+
+    def integrity_errors(self):
+        """Exception types for constraint violations (duplicate key, foreign key, ...)"""
+        return ()
+
+    def describe(self):
+        return self.name
+
+
+class SqlServerBackend(Backend):
+    """The original SQL Server database over ODBC"""
+    name = "sqlserver"
+    dialect = "tsql"
+
+    def __init__(self, connection_string):
+        self.connection_string = connection_string
+
+    def connect(self):
+        """Bulletproof SQL Server connection with Windows Authentication"""
+        import pyodbc
+        try:
+            return pyodbc.connect(self.connection_string)
+        except pyodbc.Error as e:
+            print(f"CONNECTION FAILED: {str(e)}")
+            print(f"Using connection string: {self.connection_string}")
+            print("Troubleshooting tips:")
+            print("1. Verify SQL Server is running")
+            print("2. Check firewall allows port 1433")
+            print("3. Try 'SERVER=127.0.0.1' instead of 'localhost'")
+            raise
+
+    def driver_errors(self):
+        import pyodbc
+        return (pyodbc.Error,)
+
+    def integrity_errors(self):
+        import pyodbc
+        return (pyodbc.IntegrityError,)
+
+
+class SqliteBackend(Backend):
+    """Embedded database file built from DDL.sql and INSERTS.sql on first use.
+
+    path=":memory:" keeps everything in RAM, shared by every connection of this
+    backend for as long as the backend object lives.
+    """
+    name = "sqlite"
+    dialect = "sqlite"
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, ddl_file=DDL_FILE, inserts_file=INSERTS_FILE):
+        self.ddl_file = ddl_file
+        self.inserts_file = inserts_file
+        self._build_lock = threading.Lock()
+        self._keeper = None  # Holds a shared in-memory database open
+
+        if path == ":memory:":
+            self.path = f"file:pokemonshiny-{id(self)}?mode=memory&cache=shared"
+            self.uri = True
+        else:
+            self.path = path
+            self.uri = False
+
+    def describe(self):
+        return f"sqlite ({self.path})"
+
+    def _raw_connect(self):
+        conn = sqlite3.connect(self.path, uri=self.uri, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def connect(self):
+        self.ensure_schema()
+        return self._raw_connect()
+
+    def driver_errors(self):
+        return (sqlite3.Error,)
+
+    def integrity_errors(self):
+        return (sqlite3.IntegrityError,)
+
+    def ensure_schema(self):
+        """Create and fill the database the first time it is needed"""
+        with self._build_lock:
+            if self.uri:
+                if self._keeper is None:
+                    self._keeper = self._raw_connect()
+                    self.build(self._keeper)
+                return
+            if os.path.exists(self.path):
+                return
+            # Build into a temp file so a crash never leaves a half-built database behind
+            tmp_path = self.path + ".building"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            conn = sqlite3.connect(tmp_path)
+            try:
+                self.build(conn)
+            finally:
+                conn.close()
+            os.replace(tmp_path, self.path)
+
+    def build(self, conn):
+        """Run the translated DDL and reference data against conn"""
+        for sql_file in (self.ddl_file, self.inserts_file):
+            with open(sql_file, encoding="utf-8-sig") as f:
+                script = f.read()
+            conn.executescript(";\n".join(translate_tsql(script)) + ";")
+        conn.commit()
+
+    def close(self):
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+
+_STATEMENT_START = re.compile(r"^(create|insert|drop|alter|update|delete)\b", re.IGNORECASE)
+_SKIP_LINE = re.compile(r"^(use\s+\w+|go|drop\s+database\b.*|create\s+database\b.*)$", re.IGNORECASE)
+
+
+def _strip_comments(script):
+    """Remove -- comments, leaving anything inside string literals alone"""
+    out = []
+    in_string = False
+    i = 0
+    while i < len(script):
+        ch = script[i]
+        if in_string:
+            out.append(ch)
+            if ch == "'":
+                in_string = False
+        elif ch == "'":
+            in_string = True
+            out.append(ch)
+        elif script.startswith("--", i):
+            end = script.find("\n", i)
+            if end == -1:
+                break
+            i = end
+            continue
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def translate_tsql(script):
+    """Turn the SQL Server scripts in this folder into a list of SQLite statements.
+
+    Only handles what DDL.sql and INSERTS.sql actually use: database switching,
+    varchar(max), INCLUDE columns on indexes, statements without ';' separators
+    and the missing comma in front of a table constraint.
+    """
+    script = _strip_comments(script.lstrip("\ufeff"))
+    script = re.sub(r"varchar\s*\(\s*max\s*\)", "text", script, flags=re.IGNORECASE)
+    # SQLite indexes have no INCLUDE columns
+    script = re.sub(r"\binclude\s*\([^)]*\)", "", script, flags=re.IGNORECASE)
+
+    statements = []
+    current = []
+    for line in script.splitlines():
+        stripped = line.strip()
+        if not stripped or _SKIP_LINE.match(stripped):
+            continue
+        if _STATEMENT_START.match(stripped) and current:
+            statements.append(current)
+            current = []
+        if stripped.lower().startswith("constraint") and current:
+            prev = current[-1].rstrip()
+            if not prev.endswith((",", "(")):
+                current[-1] = prev + ","
+        current.append(line)
+    if current:
+        statements.append(current)
+
+    result = []
+    for lines in statements:
+        statement = "\n".join(lines).strip().rstrip(";").strip()
+        if statement:
+            result.append(statement)
+    return result
+
+
+def backend_from_env(connection_string):
+    """Pick a backend from POKEMON_SHINY_DB ("sqlserver", "sqlite" or "sqlite:<path>")"""
+    setting = os.environ.get("POKEMON_SHINY_DB", "sqlserver").strip()
+    if setting.lower().startswith("sqlite"):
+        _, _, path = setting.partition(":")
+        return SqliteBackend(path or DEFAULT_SQLITE_PATH)
+    return SqlServerBackend(connection_string)
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SQLITE_PATH
+    if os.path.exists(target):
+        os.remove(target)
+    SqliteBackend(target).ensure_schema()
+    print(f"Built SQLite database at {target}")
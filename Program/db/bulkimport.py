@@ -0,0 +1,319 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from . import dbconnection as dbc
+from . import refcache
+from . import stats
+
+BATCH_SIZE = 500
+
+INSERT_SQL = """
+    INSERT INTO caughtshiny (
+        shinyid, pokemon, gender, nickname, pokeball, username, otname,
+        game_caught, method, date_caught, time_caught, encounters,
+        video_link, notes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Accepted spellings for each column in the import file
+COLUMN_ALIASES = {
+    'pokemon': ('pokemon', 'pokemonname', 'species'),
+    'game': ('game', 'gamename', 'game_caught'),
+    'method': ('method', 'methodname', 'huntingmethod'),
+    'pokeball': ('pokeball', 'ball', 'ballname'),
+    'gender': ('gender',),
+    'nickname': ('nickname',),
+    'otname': ('otname', 'ot'),
+    'date_caught': ('date_caught', 'date'),
+    'time_caught': ('time_caught', 'time'),
+    'encounters': ('encounters',),
+    'video_link': ('video_link', 'video'),
+    'notes': ('notes',),
+}
+
+# Column widths from DDL.sql, checked up front so one long value can't sink the whole batch
+MAX_LENGTHS = {'otname': 20, 'video_link': 50, 'notes': 50}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y')
+TIME_FORMATS = ('%H:%M:%S', '%H:%M')
+
+
+class RowError(Exception):
+    """A single import row that cannot be stored"""
+
+
+class ImportReport:
+    """Outcome of one import run"""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_inserted = 0
+        self.errors = []  # (row number, message)
+        self.elapsed = 0.0
+        self.committed = False
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_inserted / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        status = "committed" if self.committed else "not committed"
+        return (f"{self.rows_inserted}/{self.rows_read} rows imported ({status}), "
+                f"{len(self.errors)} errors, {self.elapsed:.2f}s, "
+                f"{self.rows_per_sec:.0f} rows/sec")
+
+
+class ShinyIdAllocator:
+    """Hands out shinyid values in blocks, since caughtshiny has no identity column.
+
+    The current maximum is read once inside the import transaction (locked on
+    SQL Server, under BEGIN IMMEDIATE on SQLite) and ids are then assigned locally.
+    """
+
+    def __init__(self, cursor, dialect):
+        if dialect == "tsql":
+            cursor.execute("SELECT MAX(shinyid) FROM caughtshiny WITH (UPDLOCK, HOLDLOCK)")
+        else:
+            cursor.execute("SELECT MAX(shinyid) FROM caughtshiny")
+        self._next = (cursor.fetchone()[0] or 0) + 1
+
+    def block(self, size):
+        """Reserve size consecutive ids and return them as a range"""
+        start = self._next
+        self._next += size
+        return range(start, start + size)
+
+
+def iter_csv_rows(path):
+    """Yield (row number, dict) pairs from a CSV file without loading it whole"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def iter_json_rows(path, chunk_size=65536):
+    """Yield (row number, dict) pairs from a JSON array or JSON Lines file, incrementally.
+
+    A JSON Lines line that isn't valid JSON is yielded as a RowError in place
+    of the dict, so it is reported like any other bad row.
+    """
+    with open(path, encoding='utf-8-sig') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if first != '[':
+            # JSON Lines: one object per line
+            line_no = 1
+            line = first + f.readline()
+            while line:
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        record = RowError(f"Invalid JSON: {e.msg}")
+                    yield line_no, record
+                line_no += 1
+                line = f.readline()
+            return
+
+        decoder = json.JSONDecoder()
+        buf = ''
+        pos = 0
+        index = 0
+        eof = False
+        while True:
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ','):
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            index += 1
+            yield index, obj
+            pos = end
+
+
+def iter_rows(path):
+    """Pick the parser from the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return iter_csv_rows(path)
+    if ext in ('.json', '.jsonl', '.ndjson'):
+        return iter_json_rows(path)
+    raise ValueError(f"Unsupported import file type: {ext or path}")
+
+
+def _field(record, key):
+    for alias in COLUMN_ALIASES[key]:
+        value = record.get(alias)
+        if value is not None:
+            value = str(value).strip()
+            return value or None
+    return None
+
+
+def _parse(value, formats, parse, label):
+    if value is None:
+        return None
+    for fmt in formats:
+        try:
+            return parse(datetime.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise RowError(f"Invalid {label}: {value}")
+
+
+def build_row(record, refdata, username):
+    """Turn one file record into an insert tuple (without shinyid), or raise RowError"""
+    if not isinstance(record, dict):
+        raise RowError("Expected an object with named fields")
+
+    ids = {}
+    for key, table, required in (('pokemon', refdata.pokemon, True),
+                                 ('game', refdata.games, True),
+                                 ('method', refdata.methods, True),
+                                 ('pokeball', refdata.balls, False)):
+        name = _field(record, key)
+        if name is None:
+            if required:
+                raise RowError(f"Missing {key}")
+            ids[key] = None
+            continue
+        ids[key] = table.lookup(name)
+        if ids[key] is None:
+            raise RowError(f"Unknown {key}: {name}")
+
+    values = {key: _field(record, key) for key in ('gender', 'nickname', 'otname', 'video_link', 'notes')}
+    for key, limit in MAX_LENGTHS.items():
+        if values[key] and len(values[key]) > limit:
+            raise RowError(f"{key} is longer than {limit} characters")
+
+    date_caught = _parse(_field(record, 'date_caught'), DATE_FORMATS, datetime.date, "date")
+    time_caught = _parse(_field(record, 'time_caught'), TIME_FORMATS, datetime.time, "time")
+
+    encounters = _field(record, 'encounters')
+    try:
+        encounters = int(encounters) if encounters is not None else None
+    except ValueError:
+        raise RowError(f"Invalid encounters: {encounters}")
+    if encounters is not None and encounters < 0:
+        raise RowError("Encounters cannot be negative")
+
+    return (
+        ids['pokemon'],
+        values['gender'] or "Unknown",
+        values['nickname'],
+        ids['pokeball'],
+        username,
+        values['otname'] or username,
+        ids['game'],
+        ids['method'],
+        date_caught.isoformat() if date_caught is not None else None,
+        time_caught.isoformat() if time_caught is not None else None,
+        encounters,
+        values['video_link'],
+        values['notes'],
+    )
+
+
+def import_shinies(path, username, conn=None, batch_size=BATCH_SIZE, strict=False,
+                   dry_run=False, dialect=None):
+    """Import every row of path into caughtshiny for username in one transaction.
+
+    Bad rows are reported and skipped; with strict=True any bad row rolls the
+    whole import back. dry_run validates everything and rolls back at the end.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    dialect = dialect or dbc.get_backend().dialect
+    own_conn = conn is None
+    if own_conn:
+        conn = dbc.get_db_connection()
+
+    try:
+        refdata = refcache.get_reference_data(conn)
+        cursor = conn.cursor()
+        if hasattr(cursor, 'fast_executemany'):
+            cursor.fast_executemany = True  # pyodbc sends the whole batch as one parameter array
+        if dialect == "sqlite":
+            cursor.execute("BEGIN IMMEDIATE")  # Take the write lock before reading MAX(shinyid)
+
+        cursor.execute("SELECT 1 FROM account WHERE username = ?", (username,))
+        if not cursor.fetchone():
+            raise ValueError(f"Unknown account: {username}")
+
+        allocator = ShinyIdAllocator(cursor, dialect)
+        batch = []
+        delta = stats.StatsDelta(username)  # Applied once at the end instead of per row
+
+        def flush():
+            ids = allocator.block(len(batch))
+            cursor.executemany(INSERT_SQL, [(shinyid,) + row for shinyid, row in zip(ids, batch)])
+            for row in batch:
+                delta.add(row[6], row[7], row[3], row[10], refdata.method_odds)
+            report.rows_inserted += len(batch)
+            batch.clear()
+
+        for row_no, record in iter_rows(path):
+            report.rows_read += 1
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                batch.append(build_row(record, refdata, username))
+            except RowError as e:
+                report.errors.append((row_no, str(e)))
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        stats.apply_delta(cursor, delta, dialect)
+
+        if dry_run or (strict and report.errors):
+            conn.rollback()
+        else:
+            conn.commit()
+            report.committed = True
+    except Exception:
+        conn.rollback()
+        report.rows_inserted = 0
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+        report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk import caught shinies from CSV or JSON")
+    parser.add_argument("file", help="CSV, JSON array or JSON Lines file")
+    parser.add_argument("--user", required=True, help="Account the shinies belong to")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--strict", action="store_true", help="Import nothing if any row is bad")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, roll back at the end")
+    args = parser.parse_args(argv)
+
+    report = import_shinies(args.file, args.user, batch_size=args.batch_size,
+                            strict=args.strict, dry_run=args.dry_run)
+    for row_no, message in report.errors:
+        print(f"Row {row_no}: {message}")
+    print(report.summary())
+    return 1 if report.errors and args.strict else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,27 +1,130 @@
-import pyodbc
+import atexit
+import os
+import threading
+from . import instrument
+from .backends import backend_from_env
+from .pool import ConnectionPool
+
+# Using the exact driver name from your list
+CONNECTION_STRING = (
+    'DRIVER={ODBC Driver 17 for SQL Server};'
+    'SERVER=localhost;'
+    'DATABASE=PokemonShiny;'
+    'Trusted_Connection=yes;'
+    'Encrypt=no;'  # Disable encryption for testing
+)
+
+# Pool settings, overridable through the environment
+POOL_SIZE = int(os.environ.get('POKEMON_SHINY_POOL_SIZE', 5))
+POOL_IDLE_TIMEOUT = float(os.environ.get('POKEMON_SHINY_POOL_IDLE_TIMEOUT', 300))
+POOL_CHECKOUT_TIMEOUT = float(os.environ.get('POKEMON_SHINY_POOL_CHECKOUT_TIMEOUT', 10))
+# Set POKEMON_SHINY_DB_STATS=1 to time every statement and print the table on exit
+INSTRUMENT = os.environ.get('POKEMON_SHINY_DB_STATS', '') not in ('', '0')
+
+_backend = None
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_backend():
+    """Active backend, chosen from POKEMON_SHINY_DB on first use (SQL Server by default)"""
+    global _backend
+    if _backend is None:
+        with _pool_lock:
+            if _backend is None:
+                _backend = backend_from_env(CONNECTION_STRING)
+    return _backend
+
+
+def set_backend(backend, **pool_options):
+    """Switch to another backend (e.g. SqliteBackend) and rebuild the pool for it"""
+    global _backend
+    with _pool_lock:
+        _backend = backend
+    return configure_pool(**pool_options)
+
+
+def connect_raw():
+    """Open a raw connection on the active backend, bypassing the pool"""
+    return get_backend().connect()
+
+
+def _maybe_instrument(connect):
+    return instrument.instrument(connect) if INSTRUMENT else connect
+
+
+def enable_instrumentation(slow_ms=instrument.SLOW_QUERY_MS, slow_log=instrument.SLOW_QUERY_LOG,
+                           dump_path=None):
+    """Time every statement from now on, log slow ones and dump the stats at exit"""
+    global INSTRUMENT
+    if INSTRUMENT and _pool is not None:
+        return
+    INSTRUMENT = True
+    instrument.configure_slow_log(slow_log, slow_ms)
+    instrument.dump_on_exit(path=dump_path)
+    configure_pool()
+
+
+def query_stats():
+    """Per-statement count, total/p50/p95 latency and rows, most expensive first"""
+    return instrument.query_stats.snapshot()
+
+
+def configure_pool(connect=None, max_size=POOL_SIZE, idle_timeout=POOL_IDLE_TIMEOUT,
+                   checkout_timeout=POOL_CHECKOUT_TIMEOUT, health_check="SELECT 1"):
+    """(Re)create the process-wide pool, e.g. to point it at a stand-in database"""
+    global _pool
+    backend = get_backend()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(
+            _maybe_instrument(connect or backend.connect),
+            max_size=max_size,
+            idle_timeout=idle_timeout,
+            checkout_timeout=checkout_timeout,
+            health_check=health_check,
+        )
+        return _pool
+
+
+def get_pool():
+    """Process-wide connection pool, created on first use"""
+    global _pool
+    if _pool is None:
+        backend = get_backend()
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _maybe_instrument(backend.connect),
+                    max_size=POOL_SIZE,
+                    idle_timeout=POOL_IDLE_TIMEOUT,
+                    checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+                )
+    return _pool
 
 
 def get_db_connection():
-    """Bulletproof SQL Server connection with Windows Authentication"""
-    # Using the exact driver name from your list
-    connection_string = (
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=localhost;'
-        'DATABASE=PokemonShiny;'
-        'Trusted_Connection=yes;'
-        'Encrypt=no;'  # Disable encryption for testing
-    )
-
-    print(f"Using connection string: {connection_string}")  # Debug output
-
-    try:
-        conn = pyodbc.connect(connection_string)
-        print("Connection successful!")
-        return conn
-    except pyodbc.Error as e:
-        print(f"CONNECTION FAILED: {str(e)}")
-        print("Troubleshooting tips:")
-        print("1. Verify SQL Server is running")
-        print("2. Check firewall allows port 1433")
-        print("3. Try 'SERVER=127.0.0.1' instead of 'localhost'")
-        raise
\ No newline at end of file
+    """Check out a pooled connection. Calling close() on it returns it to the pool."""
+    return get_pool().get()
+
+
+def pool_stats():
+    """Counters for checkouts, waits and new connects"""
+    return get_pool().stats()
+
+
+def close_pool():
+    """Close every pooled connection (registered to run at exit)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+if INSTRUMENT:
+    instrument.configure_slow_log()
+    instrument.dump_on_exit(path=os.environ.get('POKEMON_SHINY_DB_STATS_FILE'))
@@ -0,0 +1,188 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from . import dbconnection as dbc
+
+WORKERS = 2
+CALL_WORKERS = 2  # For submit_call jobs, which borrow connections themselves
+POLL_MS = 25
+
+log = logging.getLogger("pokemon_shiny.executor")
+
+
+class Job:
+    """Handle for a submitted query. Cancelling it means its callbacks never run."""
+
+    def __init__(self, fn, args, on_success, on_error, group):
+        self.fn = fn
+        self.args = args
+        self.on_success = on_success
+        self.on_error = on_error
+        self.group = group
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class JobGroup:
+    """All jobs started by one window, so closing it can cancel them together"""
+
+    def __init__(self):
+        self._jobs = set()
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def add(self, job):
+        with self._lock:
+            if self.closed:
+                job.cancel()
+            self._jobs.add(job)
+
+    def discard(self, job):
+        with self._lock:
+            self._jobs.discard(job)
+
+    @property
+    def busy(self):
+        with self._lock:
+            return any(not job.cancelled for job in self._jobs)
+
+    def cancel_all(self):
+        """Cancel everything still pending and refuse new jobs"""
+        with self._lock:
+            self.closed = True
+            for job in self._jobs:
+                job.cancel()
+            self._jobs.clear()
+
+
+class DbExecutor:
+    """Runs database work on worker threads and hands results back to Tk.
+
+    fn(conn, *args) runs on a worker with a pooled connection; on_success(result)
+    or on_error(exception) then runs on the Tk thread via root.after.
+    submit_call(fn, *args) is the same without the connection, for work that
+    spends most of its time elsewhere (e.g. bcrypt) and borrows a connection
+    only for its statements, so it doesn't tie up a database worker.
+    """
+
+    def __init__(self, root, workers=WORKERS, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0  # Only touched on the Tk thread
+        self._polling = False
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"db-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._call_pool = None
+
+    def submit(self, fn, *args, on_success=None, on_error=None, group=None):
+        """Queue fn(conn, *args) and return its Job (call from the Tk thread)"""
+        job = Job(fn, args, on_success, on_error, group)
+        if group is not None:
+            group.add(job)
+        self._pending += 1
+        self._jobs.put(job)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def submit_call(self, fn, *args, on_success=None, on_error=None, group=None):
+        """Queue fn(*args) on a non-database thread and return its Job (call from the Tk thread)"""
+        job = Job(fn, args, on_success, on_error, group)
+        if group is not None:
+            group.add(job)
+        if self._call_pool is None:
+            self._call_pool = ThreadPoolExecutor(max_workers=CALL_WORKERS,
+                                                 thread_name_prefix="call-worker")
+        self._pending += 1
+        self._call_pool.submit(self._call, job)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def _call(self, job):
+        if job.cancelled:
+            self._results.put((job, None, None))
+            return
+        try:
+            result, error = job.fn(*job.args), None
+        except Exception as e:
+            result, error = None, e
+        self._results.put((job, result, error))
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled:
+                self._results.put((job, None, None))
+                continue
+            conn = None
+            try:
+                conn = dbc.get_db_connection()
+                result, error = job.fn(conn, *job.args), None
+            except Exception as e:
+                result, error = None, e
+            finally:
+                if conn is not None:
+                    conn.close()
+            self._results.put((job, result, error))
+
+    def _poll(self):
+        """Deliver finished jobs on the Tk thread, rescheduling while work is pending"""
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            job.done = True
+            if job.group is not None:
+                job.group.discard(job)
+            if job.cancelled:
+                continue
+            try:
+                if error is not None:
+                    if job.on_error:
+                        job.on_error(error)
+                    else:
+                        log.error("Background query failed: %s", error, exc_info=error)
+                elif job.on_success:
+                    job.on_success(result)
+            except Exception:
+                # A broken callback must not stop delivery for everyone else
+                log.exception("Callback for a background query failed")
+
+        if self._pending > 0:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        """Stop the worker threads once the queued jobs are done"""
+        for _ in self._threads:
+            self._jobs.put(None)
+        if self._call_pool is not None:
+            self._call_pool.shutdown(wait=False)
+
+
+_executor = None
+
+
+def get_executor(widget):
+    """Process-wide executor, bound to the Tk root that owns widget"""
+    global _executor
+    if _executor is None:
+        _executor = DbExecutor(widget.nametowidget('.'))
+    return _executor
@@ -0,0 +1,236 @@
+import atexit
+import logging
+import os
+import re
+import threading
+import time
+
+SLOW_QUERY_MS = float(os.environ.get('POKEMON_SHINY_SLOW_QUERY_MS', 200))
+SLOW_QUERY_LOG = os.environ.get('POKEMON_SHINY_SLOW_QUERY_LOG', 'slow_queries.log')
+MAX_SAMPLES = 2048  # Latency samples kept per statement for the percentiles
+
+slow_log = logging.getLogger("pokemon_shiny.slow_queries")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize(sql):
+    """Collapse whitespace and literals so the same statement always gets the same key"""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(?...)", sql)
+
+
+class StatementStats:
+    """Timings for one normalized statement"""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.samples = []
+        self._next_sample = 0
+
+    def record(self, elapsed, rows):
+        self.count += 1
+        self.total += elapsed
+        self.rows += rows
+        # Fixed-size ring of recent samples keeps memory flat under load
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(elapsed)
+        else:
+            self.samples[self._next_sample] = elapsed
+            self._next_sample = (self._next_sample + 1) % MAX_SAMPLES
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def as_dict(self):
+        return {
+            'sql': self.sql,
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'rows': self.rows,
+        }
+
+
+class QueryStats:
+    """Registry of per-statement stats shared by every instrumented connection"""
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, elapsed, rows):
+        key = normalize(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(key)
+            stats.record(elapsed, rows)
+        if self.slow_ms is not None and elapsed * 1000 >= self.slow_ms:
+            slow_log.warning("%.1f ms, %d rows: %s", elapsed * 1000, rows, key)
+        return key
+
+    def add_rows(self, key, rows):
+        """Rows fetched after execute() returned are counted against the same statement"""
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats.rows += rows
+
+    def snapshot(self):
+        """Stats for every statement, the most expensive (by total time) first"""
+        with self._lock:
+            rows = [stats.as_dict() for stats in self._stats.values()]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def report(self, limit=None):
+        """Human-readable table of the snapshot"""
+        lines = [f"{'count':>7} {'total ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'rows':>8}  statement"]
+        for row in self.snapshot()[:limit]:
+            sql = row['sql'] if len(row['sql']) <= 100 else row['sql'][:97] + "..."
+            lines.append(f"{row['count']:>7} {row['total_ms']:>10.1f} {row['p50_ms']:>8.2f} "
+                         f"{row['p95_ms']:>8.2f} {row['rows']:>8}  {sql}")
+        return "\n".join(lines)
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that times execute/executemany and counts fetched rows"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._last_key = None
+
+    def execute(self, sql, *params):
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute(sql, *params)
+        finally:
+            self._last_key = self._stats.record(sql, time.perf_counter() - started, 0)
+        # Keep `cursor.execute(...).fetchall()` chains going through the wrapper
+        return self if result is self._cursor else result
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        started = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, seq_of_params)
+        finally:
+            self._last_key = self._stats.record(sql, time.perf_counter() - started, len(seq_of_params))
+        return self
+
+    def _count(self, rows):
+        if self._last_key is not None:
+            self._stats.add_rows(self._last_key, rows)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count(1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # Driver options such as pyodbc's fast_executemany belong on the real cursor
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+
+class InstrumentedConnection:
+    """Connection wrapper whose cursors report into a QueryStats registry"""
+
+    def __init__(self, conn, stats):
+        self._conn = conn
+        self._stats = stats
+
+    def cursor(self):
+        return InstrumentedCursor(self._conn.cursor(), self._stats)
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+query_stats = QueryStats()
+
+
+def instrument(connect, stats=query_stats):
+    """Wrap a connection factory so every connection it makes is instrumented"""
+    def instrumented_connect():
+        return InstrumentedConnection(connect(), stats)
+    return instrumented_connect
+
+
+def configure_slow_log(path=SLOW_QUERY_LOG, threshold_ms=SLOW_QUERY_MS, stats=query_stats):
+    """Send slow statements to a log file"""
+    stats.slow_ms = threshold_ms
+    if not any(isinstance(h, logging.FileHandler) for h in slow_log.handlers):
+        handler = logging.FileHandler(path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_log.addHandler(handler)
+    slow_log.setLevel(logging.WARNING)
+
+
+_exit_dump = None  # {'stats', 'path'} once the exit dump is registered
+
+
+def dump_on_exit(stats=query_stats, path=None):
+    """Print (or write to path) the statement table when the process exits.
+
+    Registers a single dump however often it is called; later calls only
+    change what is dumped, and where when they give a path.
+    """
+    global _exit_dump
+    if _exit_dump is not None:
+        _exit_dump['stats'] = stats
+        _exit_dump['path'] = path or _exit_dump['path']
+        return
+    _exit_dump = {'stats': stats, 'path': path}
+
+    def dump():
+        text = _exit_dump['stats'].report()
+        if _exit_dump['path']:
+            with open(_exit_dump['path'], 'w', encoding='utf-8') as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+    atexit.register(dump)
@@ -0,0 +1,205 @@
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the checkout timeout"""
+
+
+class PoolClosed(Exception):
+    """Raised when a connection is requested from a pool that was shut down"""
+
+
+class PooledConnection:
+    """Connection handed out by the pool. close() gives it back instead of closing it."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    @property
+    def raw(self):
+        if self._raw is None:
+            raise PoolClosed("Connection was already returned to the pool")
+        return self._raw
+
+    def cursor(self):
+        return self.raw.cursor()
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)"""
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw)
+
+    def discard(self):
+        """Throw the connection away instead of reusing it (e.g. after a network error)"""
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, discard=True)
+
+    def __getattr__(self, name):
+        # Anything we don't wrap (autocommit, setinputsizes, ...) goes to the driver
+        return getattr(self.raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """Small thread-safe pool so every screen reuses warm connections.
+
+    connect is any zero-argument callable returning a DB-API connection, which
+    lets the same pool run against SQL Server or a local stand-in database.
+    """
+
+    def __init__(self, connect, max_size=5, idle_timeout=300.0,
+                 checkout_timeout=10.0, health_check="SELECT 1"):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check = health_check
+
+        self._idle = []  # (raw connection, time it was returned), most recent last
+        self._open = 0  # connections currently alive (idle + checked out)
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.checkouts = 0
+        self.waits = 0
+        self.connects = 0
+        self.health_failures = 0
+        self.idle_expired = 0
+
+    def get(self):
+        """Check a connection out of the pool, opening a new one if there is room"""
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed("Connection pool has been shut down")
+                self._expire_idle()
+                if self._idle:
+                    raw, _ = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    raw = None
+                    break
+                if not waited:
+                    waited = True
+                    self.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"No database connection free after {self.checkout_timeout}s "
+                        f"(pool size {self.max_size})")
+                self._cond.wait(remaining)
+            self.checkouts += 1
+
+        # Connecting and pinging happen outside the lock so other threads aren't held up
+        if raw is not None and not self._is_healthy(raw):
+            self._close_quietly(raw)
+            raw = None
+        if raw is None:
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self.connects += 1
+        return PooledConnection(self, raw)
+
+    def _is_healthy(self, raw):
+        if not self.health_check:
+            return True
+        try:
+            cursor = raw.cursor()
+            cursor.execute(self.health_check)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            with self._cond:
+                self.health_failures += 1
+            return False
+
+    def _expire_idle(self):
+        """Close connections that sat unused longer than idle_timeout (lock held)"""
+        if self.idle_timeout is None:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        fresh = []
+        for raw, returned_at in self._idle:
+            if returned_at < cutoff:
+                self._close_quietly(raw)
+                self._open -= 1
+                self.idle_expired += 1
+            else:
+                fresh.append((raw, returned_at))
+        self._idle = fresh
+
+    def _release(self, raw, discard=False):
+        if not discard:
+            try:
+                # Never hand the next user someone else's half-finished transaction
+                raw.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            if discard or self._closed:
+                self._close_quietly(raw)
+                self._open -= 1
+            else:
+                self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Shut the pool down. Idle connections close now, busy ones when returned."""
+        with self._cond:
+            self._closed = True
+            for raw, _ in self._idle:
+                self._close_quietly(raw)
+                self._open -= 1
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self):
+        """Snapshot of the pool counters"""
+        with self._cond:
+            return {
+                'size': self.max_size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'connects': self.connects,
+                'health_failures': self.health_failures,
+                'idle_expired': self.idle_expired,
+            }
@@ -0,0 +1,175 @@
+from . import dbconnection as dbc
+from . import stats
+
+COLLECTION_PAGE_SIZE = 40
+
+# Same columns, in the same order, as the tuples CollectionPage unpacks
+COLLECTION_COLUMNS = """
+    cs.shinyid,
+    pb.pokemonname,
+    cs.gender,
+    cs.nickname,
+    pball.ballname,
+    cs.username,
+    cs.otname,
+    g.gamename,
+    hm.methodname,
+    cs.date_caught,
+    cs.time_caught,
+    cs.encounters,
+    cs.video_link,
+    cs.notes
+"""
+
+# pokeball is nullable, so it is the one outer join
+COLLECTION_FROM = """
+    FROM caughtshiny cs
+    JOIN pokedex pb ON cs.pokemon = pb.dexnr
+    LEFT JOIN pokeball pball ON cs.pokeball = pball.ballnr
+    JOIN game g ON cs.game_caught = g.gameid
+    JOIN huntingmethod hm ON cs.method = hm.methodid
+"""
+
+# Newest first. NULL dates/times sort last on both SQL Server and SQLite for DESC.
+COLLECTION_ORDER = "ORDER BY cs.date_caught DESC, cs.time_caught DESC, cs.shinyid DESC"
+COLLECTION_KEY_COLUMNS = ("cs.date_caught", "cs.time_caught", "cs.shinyid")
+COLLECTION_KEY_INDEXES = (9, 10, 0)  # Positions of the key columns in a result row
+
+
+def _seek_after(columns, values):
+    """WHERE clause for rows strictly after `values` in DESC order with NULLs last.
+
+    Expands (a, b, c) < (x, y, z) into OR'ed prefixes and treats a NULL cursor
+    value as "only more NULLs can follow".
+    """
+    clauses = []
+    params = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        parts = []
+        part_params = []
+        for prev_column, prev_value in zip(columns[:i], values[:i]):
+            if prev_value is None:
+                parts.append(f"{prev_column} IS NULL")
+            else:
+                parts.append(f"{prev_column} = ?")
+                part_params.append(prev_value)
+        if value is None:
+            continue  # Nothing sorts after NULL in this column
+        parts.append(f"({column} < ? OR {column} IS NULL)")
+        part_params.append(value)
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(part_params)
+    if not clauses:
+        return "1 = 0", []
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def fetch_collection_page(conn, username, after=None, page_size=COLLECTION_PAGE_SIZE, dialect=None):
+    """One page of a user's collection plus the cursor for the next page.
+
+    after is the cursor returned by the previous call (None for the first page).
+    The returned cursor is None once the last page has been read.
+    """
+    dialect = dialect or dbc.get_backend().dialect
+    where = "WHERE cs.username = ?"
+    params = [username]
+    if after is not None:
+        seek, seek_params = _seek_after(COLLECTION_KEY_COLUMNS, after)
+        where += f" AND {seek}"
+        params.extend(seek_params)
+
+    limit = page_size + 1  # One extra row tells us whether another page exists
+    if dialect == "tsql":
+        sql = f"SELECT TOP ({limit}) {COLLECTION_COLUMNS} {COLLECTION_FROM} {where} {COLLECTION_ORDER}"
+    else:
+        sql = f"SELECT {COLLECTION_COLUMNS} {COLLECTION_FROM} {where} {COLLECTION_ORDER} LIMIT {limit}"
+
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = tuple(last[i] for i in COLLECTION_KEY_INDEXES)
+    else:
+        next_cursor = None
+    return rows, next_cursor
+
+
+def count_collection(conn, username):
+    """Number of shinies a user has, from the running totals (no scan of caughtshiny)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT total_shinies FROM userstats WHERE username = ?", (username,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def add_shiny_by_name(conn, pokemon, game, method, ball, username, gender=None, nickname=None,
+                      otname=None, date_caught=None, time_caught=None, encounters=None,
+                      video_link=None, notes=None, dialect=None):
+    """Add a shiny by display names and commit.
+
+    Names are resolved and the next shinyid assigned by the database itself:
+    the add_caughtshiny procedure (PROCEDURES.sql) on SQL Server, one round
+    trip including the statistics. On SQLite it is a single INSERT ... SELECT
+    ... RETURNING followed by the two userstats upserts and the commit, four
+    statements where looking the names up first took nine. Returns the new row
+    in the same shape as fetch_collection_page rows.
+    """
+    dialect = dialect or dbc.get_backend().dialect
+    cursor = conn.cursor()
+
+    if dialect == "tsql":
+        cursor.execute(
+            "EXEC add_caughtshiny ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?",
+            (pokemon, game, method, ball, username, gender, nickname, otname,
+             date_caught, time_caught, encounters, video_link, notes))
+        row = cursor.fetchone()
+        conn.commit()
+        return tuple(row)
+
+    cursor.execute("""
+        INSERT INTO caughtshiny (
+            shinyid, pokemon, gender, nickname, pokeball, username, otname,
+            game_caught, method, date_caught, time_caught, encounters,
+            video_link, notes
+        )
+        SELECT
+            (SELECT COALESCE(MAX(shinyid), 0) + 1 FROM caughtshiny),
+            p.dexnr, ?, ?, b.ballnr, ?, ?, g.gameid, m.methodid, ?, ?, ?, ?, ?
+        FROM pokedex p
+        CROSS JOIN game g
+        CROSS JOIN huntingmethod m
+        LEFT JOIN pokeball b ON b.ballname = ?
+        WHERE p.pokemonname = ? AND g.gamename = ? AND m.methodname = ?
+          AND (? IS NULL OR b.ballnr IS NOT NULL)
+        RETURNING shinyid, game_caught, method, pokeball
+    """, (gender, nickname, username, otname, date_caught, time_caught, encounters,
+          video_link, notes, ball, pokemon, game, method, ball))
+    inserted = cursor.fetchone()
+    if inserted is None:
+        conn.rollback()
+        raise ValueError("Unknown Pokémon, game, method or Poké Ball")
+    shinyid, game_id, method_id, ball_id = inserted
+    stats.record_insert(cursor, username, game_id, method_id, ball_id, encounters)
+    conn.commit()
+    return (shinyid, pokemon, gender, nickname, ball, username, otname, game, method,
+            date_caught, time_caught, encounters, video_link, notes)
+
+
+def delete_caughtshiny(conn, shinyid):
+    """Delete one shiny, update its owner's statistics and commit. Returns False if it didn't exist."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT username, game_caught, method, pokeball, encounters
+        FROM caughtshiny WHERE shinyid = ?
+    """, (shinyid,))
+    row = cursor.fetchone()
+    if not row:
+        return False
+    cursor.execute("DELETE FROM caughtshiny WHERE shinyid = ?", (shinyid,))
+    username, game, method, ball, encounters = row
+    stats.record_delete(cursor, username, game, method, ball, encounters)
+    conn.commit()
+    return True
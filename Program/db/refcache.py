@@ -0,0 +1,114 @@
+import threading
+from . import dbconnection as dbc
+
+
+class LookupTable:
+    """Two-way name <-> id map for one reference table, in display order"""
+
+    def __init__(self, rows):
+        self.names = []
+        self.by_name = {}
+        self.by_id = {}
+        self._folded = {}  # casefolded name -> id, for hand-typed input
+        for id_, name in rows:
+            self.names.append(name)
+            self.by_name[name] = id_
+            self.by_id[id_] = name
+            self._folded.setdefault(name.strip().casefold(), id_)
+
+    def id_for(self, name):
+        """ID for a display name, raising KeyError for names not in the table"""
+        return self.by_name[name]
+
+    def lookup(self, name):
+        """ID for a name ignoring case and surrounding spaces, or None"""
+        id_ = self.by_name.get(name)
+        if id_ is None and name:
+            id_ = self._folded.get(name.strip().casefold())
+        return id_
+
+    def name_for(self, id_):
+        return self.by_id[id_]
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def __len__(self):
+        return len(self.names)
+
+
+class ReferenceData:
+    """Snapshot of pokedex, game, huntingmethod and pokeball"""
+
+    QUERIES = {
+        'pokemon': "SELECT dexnr, pokemonname FROM pokedex ORDER BY dexnr",
+        'games': "SELECT gameid, gamename FROM game ORDER BY gamename",
+        'methods': "SELECT methodid, methodname FROM huntingmethod ORDER BY methodname",
+        'balls': "SELECT ballnr, ballname FROM pokeball ORDER BY ballname",
+    }
+
+    def __init__(self, version, tables, method_odds, game_generations=None):
+        self.version = version
+        self.pokemon = tables['pokemon']
+        self.games = tables['games']
+        self.methods = tables['methods']
+        self.balls = tables['balls']
+        self.method_odds = method_odds  # methodid -> baseodds denominator
+        self.game_generations = game_generations or {}  # gameid -> generationid
+
+    @classmethod
+    def load(cls, conn, version):
+        cursor = conn.cursor()
+        tables = {}
+        for key, query in cls.QUERIES.items():
+            cursor.execute(query)
+            tables[key] = LookupTable(cursor.fetchall())
+        cursor.execute("SELECT methodid, baseodds FROM huntingmethod")
+        method_odds = {methodid: float(odds) if odds else None for methodid, odds in cursor.fetchall()}
+        cursor.execute("SELECT gameid, generationid FROM game")
+        game_generations = dict(cursor.fetchall())
+        return cls(version, tables, method_odds, game_generations)
+
+
+_data = None
+_version = 0
+_lock = threading.Lock()
+
+
+def get_reference_data(conn=None):
+    """Shared reference data, loaded from the database once per process.
+
+    Uses conn if given, otherwise borrows a pooled connection for the load.
+    """
+    global _data
+    data = _data
+    if data is not None:
+        return data
+    with _lock:
+        if _data is None:
+            if conn is not None:
+                _data = ReferenceData.load(conn, _version)
+            else:
+                pooled = dbc.get_db_connection()
+                try:
+                    _data = ReferenceData.load(pooled, _version)
+                finally:
+                    pooled.close()
+        return _data
+
+
+def peek():
+    """The cached snapshot if it is already loaded, without touching the database"""
+    return _data
+
+
+def invalidate():
+    """Drop the cached snapshot; the next get_reference_data() reloads it"""
+    global _data, _version
+    with _lock:
+        _data = None
+        _version += 1
+
+
+def current_version():
+    return _version
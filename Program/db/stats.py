@@ -0,0 +1,223 @@
+from . import dbconnection as dbc
+from . import refcache
+
+DIMENSIONS = ('game', 'method', 'ball')
+NO_BALL = 0  # itemid used in the ball breakdown when no ball was recorded
+
+
+class StatsDelta:
+    """Change to one user's totals, built up from inserted (+1) or deleted (-1) shinies"""
+
+    def __init__(self, username):
+        self.username = username
+        self.shinies = 0
+        self.encounters = 0
+        self.counted = 0
+        self.luck = 0.0
+        self.breakdown = {}  # (dimension, itemid) -> [shinies, encounters]
+
+    def add(self, game, method, ball, encounters, method_odds, sign=1):
+        self.shinies += sign
+        if encounters is not None:
+            self.encounters += sign * encounters
+            self.counted += sign
+            odds = method_odds.get(method)
+            if odds:
+                self.luck += sign * encounters / odds
+        for key in (('game', game), ('method', method), ('ball', ball if ball is not None else NO_BALL)):
+            entry = self.breakdown.setdefault(key, [0, 0])
+            entry[0] += sign
+            entry[1] += sign * (encounters or 0)
+
+    def __bool__(self):
+        return bool(self.shinies or self.breakdown)
+
+
+def _upsert(cursor, update_sql, update_params, insert_sql, insert_params):
+    """UPDATE, or INSERT when the row isn't there yet (works on SQL Server and SQLite alike)"""
+    cursor.execute(update_sql, update_params)
+    if cursor.rowcount == 0:
+        cursor.execute(insert_sql, insert_params)
+
+
+def _apply_delta_sqlite(cursor, delta):
+    """Same as apply_delta, as two ON CONFLICT upserts"""
+    cursor.execute("""
+        INSERT INTO userstats (username, total_shinies, total_encounters, counted_shinies, luck_sum)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (username) DO UPDATE SET
+            total_shinies = total_shinies + excluded.total_shinies,
+            total_encounters = total_encounters + excluded.total_encounters,
+            counted_shinies = counted_shinies + excluded.counted_shinies,
+            luck_sum = luck_sum + excluded.luck_sum
+    """, (delta.username, delta.shinies, delta.encounters, delta.counted, delta.luck))
+    buckets = [(delta.username, dimension, itemid, shinies, encounters)
+               for (dimension, itemid), (shinies, encounters) in delta.breakdown.items()
+               if shinies or encounters]
+    if buckets:
+        values = ", ".join(["(?, ?, ?, ?, ?)"] * len(buckets))
+        cursor.execute(f"""
+            INSERT INTO userstats_breakdown (username, dimension, itemid, shinies, encounters)
+            VALUES {values}
+            ON CONFLICT (username, dimension, itemid) DO UPDATE SET
+                shinies = shinies + excluded.shinies,
+                encounters = encounters + excluded.encounters
+        """, [value for bucket in buckets for value in bucket])
+
+
+def apply_delta(cursor, delta, dialect=None):
+    """Write a StatsDelta inside the caller's transaction"""
+    if not delta:
+        return
+    dialect = dialect or dbc.get_backend().dialect
+    if dialect == "sqlite":
+        _apply_delta_sqlite(cursor, delta)
+    else:
+        _apply_delta_generic(cursor, delta)
+    if delta.shinies < 0:
+        # Empty buckets left behind by deletes would only clutter the breakdown
+        cursor.execute("DELETE FROM userstats_breakdown WHERE username = ? AND shinies <= 0",
+                       (delta.username,))
+
+
+def _apply_delta_generic(cursor, delta):
+    """UPDATE-then-INSERT for each row, which any backend understands"""
+    _upsert(
+        cursor,
+        """UPDATE userstats SET total_shinies = total_shinies + ?,
+               total_encounters = total_encounters + ?,
+               counted_shinies = counted_shinies + ?,
+               luck_sum = luck_sum + ?
+           WHERE username = ?""",
+        (delta.shinies, delta.encounters, delta.counted, delta.luck, delta.username),
+        """INSERT INTO userstats (username, total_shinies, total_encounters, counted_shinies, luck_sum)
+           VALUES (?, ?, ?, ?, ?)""",
+        (delta.username, delta.shinies, delta.encounters, delta.counted, delta.luck),
+    )
+    for (dimension, itemid), (shinies, encounters) in delta.breakdown.items():
+        if not shinies and not encounters:
+            continue
+        _upsert(
+            cursor,
+            """UPDATE userstats_breakdown SET shinies = shinies + ?, encounters = encounters + ?
+               WHERE username = ? AND dimension = ? AND itemid = ?""",
+            (shinies, encounters, delta.username, dimension, itemid),
+            """INSERT INTO userstats_breakdown (username, dimension, itemid, shinies, encounters)
+               VALUES (?, ?, ?, ?, ?)""",
+            (delta.username, dimension, itemid, shinies, encounters),
+        )
+
+
+def record_insert(cursor, username, game, method, ball, encounters, refdata=None):
+    """Add one newly inserted shiny to its owner's totals"""
+    refdata = refdata or refcache.get_reference_data(cursor.connection)
+    delta = StatsDelta(username)
+    delta.add(game, method, ball, encounters, refdata.method_odds)
+    apply_delta(cursor, delta)
+
+
+def record_delete(cursor, username, game, method, ball, encounters, refdata=None):
+    """Take one deleted shiny back out of its owner's totals"""
+    refdata = refdata or refcache.get_reference_data(cursor.connection)
+    delta = StatsDelta(username)
+    delta.add(game, method, ball, encounters, refdata.method_odds, sign=-1)
+    apply_delta(cursor, delta)
+
+
+def rebuild(conn, username=None):
+    """Recompute the summary tables from caughtshiny (all users, or just one) and commit"""
+    cursor = conn.cursor()
+    where, params = ("WHERE cs.username = ?", (username,)) if username else ("", ())
+    scope, scope_params = ("WHERE username = ?", (username,)) if username else ("", ())
+
+    cursor.execute(f"DELETE FROM userstats_breakdown {scope}", scope_params)
+    cursor.execute(f"DELETE FROM userstats {scope}", scope_params)
+    cursor.execute(f"""
+        INSERT INTO userstats (username, total_shinies, total_encounters, counted_shinies, luck_sum)
+        SELECT cs.username,
+               COUNT(*),
+               COALESCE(SUM(cs.encounters), 0),
+               COUNT(cs.encounters),
+               COALESCE(SUM(CAST(cs.encounters AS float) / NULLIF(hm.baseodds, 0)), 0)
+        FROM caughtshiny cs
+        JOIN huntingmethod hm ON cs.method = hm.methodid
+        {where}
+        GROUP BY cs.username
+    """, params)
+    for dimension, column in (('game', 'cs.game_caught'), ('method', 'cs.method'),
+                              ('ball', f'COALESCE(cs.pokeball, {NO_BALL})')):
+        cursor.execute(f"""
+            INSERT INTO userstats_breakdown (username, dimension, itemid, shinies, encounters)
+            SELECT cs.username, '{dimension}', {column}, COUNT(*), COALESCE(SUM(cs.encounters), 0)
+            FROM caughtshiny cs
+            {where}
+            GROUP BY cs.username, {column}
+        """, params)
+    conn.commit()
+
+
+class UserStats:
+    """What the stats view shows for one user"""
+
+    def __init__(self, username, total_shinies=0, total_encounters=0, counted_shinies=0,
+                 luck_sum=0.0, breakdown=None):
+        self.username = username
+        self.total_shinies = total_shinies
+        self.total_encounters = total_encounters
+        self.counted_shinies = counted_shinies
+        self.luck_sum = luck_sum
+        self.breakdown = breakdown or {dimension: [] for dimension in DIMENSIONS}
+
+    @property
+    def average_encounters(self):
+        return self.total_encounters / self.counted_shinies if self.counted_shinies else None
+
+    @property
+    def luck_ratio(self):
+        """Average of encounters / base odds per catch; below 1 means luckier than the odds"""
+        return self.luck_sum / self.counted_shinies if self.counted_shinies else None
+
+
+def get_user_stats(conn, username):
+    """Read a user's totals and breakdowns (two indexed queries, whatever the collection size)"""
+    refdata = refcache.get_reference_data(conn)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT total_shinies, total_encounters, counted_shinies, luck_sum
+        FROM userstats WHERE username = ?
+    """, (username,))
+    row = cursor.fetchone()
+    if not row:
+        return UserStats(username)
+
+    cursor.execute("""
+        SELECT dimension, itemid, shinies, encounters
+        FROM userstats_breakdown WHERE username = ?
+        ORDER BY shinies DESC
+    """, (username,))
+    names = {'game': refdata.games.by_id, 'method': refdata.methods.by_id, 'ball': refdata.balls.by_id}
+    breakdown = {dimension: [] for dimension in DIMENSIONS}
+    for dimension, itemid, shinies, encounters in cursor.fetchall():
+        name = names[dimension].get(itemid, "Unknown")
+        breakdown[dimension].append((name, shinies, encounters))
+    return UserStats(username, row[0], row[1], row[2], float(row[3]), breakdown)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the per-user shiny statistics")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", help="Only rebuild this account")
+    args = parser.parse_args(argv)
+
+    conn = dbc.get_db_connection()
+    try:
+        rebuild(conn, args.user)
+    finally:
+        conn.close()
+    print(f"Rebuilt statistics for {args.user or 'all users'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+# bcrypt cost factor (log2 of the key-expansion rounds); each step doubles the time
+BCRYPT_ROUNDS = int(os.environ.get('POKEMON_SHINY_BCRYPT_ROUNDS', 12))
+# bcrypt releases the GIL, so threads hash in parallel without a process pool
+HASH_WORKERS = int(os.environ.get('POKEMON_SHINY_HASH_WORKERS', 2))
+
+log = logging.getLogger("pokemon_shiny.passwords")
+
+
+def to_hash_bytes(stored):
+    """Stored hash as bytes, whatever shape the database driver handed back"""
+    if isinstance(stored, memoryview):
+        return stored.tobytes()
+    if isinstance(stored, str):
+        # Some drivers return binary columns as a hex string
+        if stored.startswith('\\x'):
+            return bytes.fromhex(stored[2:])
+        return stored.encode('latin1')
+    return bytes(stored)
+
+
+def hash_rounds(stored):
+    """Cost factor recorded in a bcrypt hash ($2b$12$...), or None if it isn't one"""
+    try:
+        parts = to_hash_bytes(stored).split(b'$')
+        return int(parts[2])
+    except (ValueError, IndexError, TypeError):
+        return None
+
+
+class PasswordService:
+    """bcrypt hashing and verification on a small thread pool.
+
+    hash() and verify() block the calling thread until the pool has done the
+    work, so call them from a worker (e.g. a DbExecutor job), never from Tk.
+    The *_async variants return futures instead.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, workers=HASH_WORKERS):
+        if not 4 <= rounds <= 31:
+            raise ValueError(f"bcrypt rounds must be between 4 and 31, got {rounds}")
+        self.rounds = rounds
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    def _hash(self, password):
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('ascii')
+
+    def _verify(self, password, stored):
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), to_hash_bytes(stored))
+        except (ValueError, TypeError) as e:
+            log.warning("Stored password hash is unreadable: %s", e)
+            return False
+
+    def needs_rehash(self, stored):
+        """True if stored was hashed with a different cost than the current one"""
+        return hash_rounds(stored) != self.rounds
+
+    def hash_async(self, password):
+        return self._pool.submit(self._hash, password)
+
+    def verify_async(self, password, stored):
+        return self._pool.submit(self._verify, password, stored)
+
+    def hash(self, password):
+        """New hash (as text) for password at the current cost"""
+        return self.hash_async(password).result()
+
+    def verify(self, password, stored):
+        return self.verify_async(password, stored).result()
+
+    def verify_and_update(self, password, stored):
+        """(ok, new_hash): new_hash is set when the password matched but its hash is out of date"""
+        if not self.verify(password, stored):
+            return False, None
+        if self.needs_rehash(stored):
+            return True, self.hash(password)
+        return True, None
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_password_service():
+    """Process-wide PasswordService using BCRYPT_ROUNDS"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PasswordService()
+    return _service
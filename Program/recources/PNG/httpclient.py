@@ -0,0 +1,168 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRIES = 5  # Attempts after the first for 429/5xx and connection errors
+BACKOFF = 1.0  # Seconds; doubled per attempt, with full jitter
+MAX_BACKOFF = 60.0
+MAX_RETRY_AFTER = 300.0  # Longest Retry-After we are willing to sleep
+TIMEOUT = 30
+USER_AGENT = "pokemon-shiny-tracker sprite scraper"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MISSING_STATUSES = {404, 410}
+
+
+class HttpError(Exception):
+    def __init__(self, url, status=None, message=None):
+        super().__init__(message or f"HTTP {status} for {url}")
+        self.url = url
+        self.status = status
+
+
+class NotFound(HttpError):
+    """The server says the file doesn't exist; retrying won't help"""
+
+
+class TransientError(HttpError):
+    """Still failing (429/5xx/network) after every retry; worth trying again on a later run"""
+
+
+def retry_after_seconds(value):
+    """Seconds from a Retry-After header (delta-seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """Keep-alive HTTP for the scrapers: one pooled session per host, polite retries.
+
+    Each host gets its own requests.Session whose connection pool is sized
+    for the number of worker threads, so after the first request to a host
+    every download reuses an open TCP+TLS connection. 429 and 5xx answers
+    and connection errors are retried with exponential backoff and full
+    jitter, or after exactly Retry-After when the server sends one. 404/410
+    raise NotFound straight away; anything still failing after the retries
+    raises TransientError, so callers can tell "not there" from "try later".
+    """
+
+    def __init__(self, limiter=None, pool_size=10, retries=RETRIES, backoff=BACKOFF,
+                 max_backoff=MAX_BACKOFF, timeout=TIMEOUT):
+        self.limiter = limiter
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._counts = {'requests': 0, 'retries': 0, 'not_found': 0, 'gave_up': 0,
+                        'backoff_s': 0.0}
+        self._statuses = {}
+
+    def session(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers['User-Agent'] = USER_AGENT
+                self._sessions[host] = session
+            return session
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._counts[key] += amount
+
+    def _delay(self, attempt, response):
+        """(seconds, True if the server asked for them with Retry-After)"""
+        retry_after = (retry_after_seconds(response.headers.get('Retry-After'))
+                       if response is not None else None)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER), True
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)), False
+
+    def get(self, url, headers=None, stream=False):
+        """Response for a 2xx/304 answer; raises NotFound, TransientError or HttpError.
+
+        With stream=True the caller must read or close the response so the
+        connection goes back to the pool.
+        """
+        session = self.session(urlsplit(url).hostname)
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                self.limiter.acquire(url)
+            self._count('requests')
+            response = None
+            try:
+                response = session.get(url, headers=headers, stream=stream, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = TransientError(url, message=f"{type(e).__name__} for {url}: {e}")
+            else:
+                status = response.status_code
+                with self._lock:
+                    self._statuses[status] = self._statuses.get(status, 0) + 1
+                if status < 400:
+                    return response
+                response.content  # Drain the (small) error body so the connection is reused
+                if status in MISSING_STATUSES:
+                    self._count('not_found')
+                    raise NotFound(url, status)
+                if status not in RETRY_STATUSES:
+                    raise HttpError(url, status)
+                error = TransientError(url, status)
+
+            if attempt == self.retries:
+                break
+            delay, from_server = self._delay(attempt, response)
+            self._count('retries')
+            self._count('backoff_s', delay)
+            if from_server and self.limiter:
+                # Retry-After applies to the whole host: hold back every worker,
+                # and let the next acquire() do this thread's waiting
+                self.limiter.pause(url, delay)
+            else:
+                time.sleep(delay)
+        self._count('gave_up')
+        raise error
+
+    def stats(self):
+        """Request/retry counts and how many requests went over an already-open connection"""
+        with self._lock:
+            sessions = list(self._sessions.items())
+            stats = dict(self._counts, statuses=dict(sorted(self._statuses.items())))
+        hosts = {}
+        for host, session in sessions:
+            opened = sent = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools[key]
+                    opened += pool.num_connections
+                    sent += pool.num_requests
+            hosts[host] = {'requests': sent, 'connections': opened,
+                           'reused': round(1 - opened / sent, 3) if sent else 0.0}
+        stats['hosts'] = hosts
+        stats['backoff_s'] = round(stats['backoff_s'], 1)
+        return stats
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
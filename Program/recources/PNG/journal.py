@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+
+SAVED = "saved"
+MISSING = "missing"  # The server answered 404: there is no such sprite
+
+
+class ProgressJournal:
+    """Scraper resume state as an append-only log of one JSON record per line.
+
+    Every finished sprite file is one appended line, flushed straight away,
+    so a crash loses at most the file that was being written and nothing is
+    ever rewritten mid-run. Loading replays the log into dicts and sets
+    (O(1) lookups), ignoring a torn last line. compact() rewrites the log as
+    a snapshot of the live state once replaced records pile up.
+
+    Records:
+        {"pokemon": [[name, dex_num], ...]}    the full Pokémon list
+        {"file": "source/game/variant/name", "status": "saved" | "missing",
+         "etag": ..., "modified": ...}    validators are optional
+        {"done": name}                          every sprite of name handled
+        {"reset": name}                         forget name's done record
+    """
+
+    def __init__(self, path, fsync=False, read_only=False):
+        self.path = path
+        self.fsync = fsync
+        self.read_only = read_only  # Records only change the in-memory view, e.g. for a dry run
+        self.pokemon = []
+        self.files = {}  # "source/game/variant/name" -> SAVED or MISSING
+        self.validators = {}  # Same keys -> (ETag, Last-Modified) of the saved copy
+        self.done = set()
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._load()
+        self._file = None if read_only else open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        try:
+            f = open(self.path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except ValueError:
+                    continue  # Torn write from a crash; that record never finished
+                self._lines += 1
+
+    def _apply(self, record):
+        if 'file' in record:
+            key = record['file']
+            self.files[key] = record['status']
+            if record.get('etag') or record.get('modified'):
+                self.validators[key] = (record.get('etag'), record.get('modified'))
+            else:
+                self.validators.pop(key, None)
+        elif 'done' in record:
+            self.done.add(record['done'])
+        elif 'reset' in record:
+            self.done.discard(record['reset'])
+        elif 'pokemon' in record:
+            self.pokemon = [tuple(entry) for entry in record['pokemon']]
+
+    def _append(self, record):
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            self._apply(record)
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._lines += 1
+
+    def set_pokemon(self, pokemon):
+        self._append({'pokemon': [list(entry) for entry in pokemon]})
+
+    def record(self, key, status, validators=None):
+        """Remember the outcome for one sprite file, with the (ETag, Last-Modified) it came with"""
+        validators = tuple(validators) if validators and any(validators) else None
+        if self.files.get(key) != status or self.validators.get(key) != validators:
+            self._append(self._file_record(key, status, validators))
+
+    @staticmethod
+    def _file_record(key, status, validators):
+        record = {'file': key, 'status': status}
+        if validators:
+            record['etag'], record['modified'] = validators
+        return record
+
+    def status(self, key):
+        """SAVED, MISSING or None if the file hasn't been tried"""
+        return self.files.get(key)
+
+    def mark_done(self, name):
+        if name not in self.done:
+            self._append({'done': name})
+
+    def reset(self, name):
+        if name in self.done:
+            self._append({'reset': name})
+
+    @property
+    def live_records(self):
+        return len(self.files) + len(self.done) + 1
+
+    def needs_compaction(self):
+        return self._lines > 2 * self.live_records + 1000
+
+    def compact(self):
+        """Rewrite the log as the current state only"""
+        if self.read_only:
+            return
+        with self._lock:
+            tmp = self.path + ".building"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                records = [{'pokemon': [list(entry) for entry in self.pokemon]}]
+                records += [self._file_record(key, status, self.validators.get(key))
+                            for key, status in self.files.items()]
+                records += [{'done': name} for name in self.done]
+                for record in records:
+                    f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._lines = len(records)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+
+
+def open_journal(path, legacy_path=None, read_only=False):
+    """Journal at path, seeded from an old JSON progress file the first time"""
+    fresh = not os.path.exists(path)
+    journal = ProgressJournal(path, read_only=read_only)
+    if fresh and legacy_path and os.path.exists(legacy_path):
+        with open(legacy_path, encoding='utf-8') as f:
+            legacy = json.load(f)
+        journal.pokemon = [tuple(entry) for entry in legacy.get('pokemon', [])]
+        journal.done.update(legacy.get('downloaded', []))
+        journal.compact()
+        if not read_only:
+            print(f"Imported {len(journal.done)} finished Pokémon from {legacy_path}")
+    elif journal.needs_compaction():
+        journal.compact()
+    return journal
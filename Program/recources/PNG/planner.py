@@ -0,0 +1,80 @@
+from journal import MISSING, SAVED
+
+# Last national dex number introduced by each generation
+GENERATION_LAST_DEX = {1: 151, 2: 251, 3: 386, 4: 493, 5: 649, 6: 721, 7: 809, 8: 905, 9: 1025}
+
+
+def generation_of(dex_num):
+    """Generation a Pokémon was introduced in, or None if the dex number is unknown"""
+    if not dex_num or dex_num < 1:
+        return None
+    for generation, last in GENERATION_LAST_DEX.items():
+        if dex_num <= last:
+            return generation
+    return max(GENERATION_LAST_DEX)  # Newer than this table; only the latest games can have it
+
+
+class DownloadPlan:
+    """The sprite requests a run will make, decided before the first one is sent"""
+
+    def __init__(self):
+        self.tasks = {}  # name -> [(game, variant), ...] still to fetch
+        self.skipped = dict.fromkeys(('generation', 'no_shiny', 'known_missing', 'saved'), 0)
+        self.pokemon = 0
+
+    @property
+    def requests(self):
+        return sum(len(sprites) for sprites in self.tasks.values())
+
+    def summary(self):
+        skipped = self.skipped
+        return (f"Plan: {self.requests} sprite requests for {len(self.tasks)} of {self.pokemon} Pokémon "
+                f"(skipped: {skipped['generation']} before the Pokémon existed, "
+                f"{skipped['no_shiny']} shiny in games without shinies, "
+                f"{skipped['known_missing']} known 404s, {skipped['saved']} already saved)")
+
+
+def plan_downloads(pokemon, games, journal, sync=False, recheck_missing=False, generations=None):
+    """Minimal (game, variant) list per Pokémon.
+
+    pokemon is [(name, dex_num), ...] (forms repeat a name and are fetched
+    once); games is POKEDB_GAMES. A game is only tried for Pokémon from its
+    generation or earlier, shiny only where the game has shinies, and a file
+    that already 404'd is not asked for again unless recheck_missing.
+    Saved files are skipped unless sync, where they get a conditional GET.
+    generations ({name: generation}, e.g. from the PokéAPI dex index) takes
+    precedence over the dex number ranges, which get forms wrong.
+    """
+    plan = DownloadPlan()
+    seen = set()
+    for name, dex_num in pokemon:
+        if name in seen:
+            continue
+        seen.add(name)
+        plan.pokemon += 1
+        if name in journal.done and not sync:
+            continue
+
+        generation = (generations or {}).get(name) or generation_of(dex_num)
+        sprites = []
+        saved_any = False
+        for game, data in games.items():
+            for variant in ('normal', 'shiny'):
+                if generation is not None and data['gen'] < generation:
+                    plan.skipped['generation'] += 1
+                    continue
+                if variant == 'shiny' and not data['has_shiny']:
+                    plan.skipped['no_shiny'] += 1
+                    continue
+                status = journal.status(f"pokedb/{game}/{variant}/{name}")
+                saved_any = saved_any or status == SAVED
+                if status == MISSING and not recheck_missing:
+                    plan.skipped['known_missing'] += 1
+                elif status == SAVED and not sync:
+                    plan.skipped['saved'] += 1
+                else:
+                    sprites.append((game, variant))
+        # Nothing to ask PokéDB and nothing from it either: still a task, for the PokéAPI fallback
+        if sprites or not saved_any:
+            plan.tasks[name] = sprites
+    return plan
@@ -0,0 +1,201 @@
+"""On-disk cache of PokéAPI documents, shared by the scrapers and the app.
+
+    python pokeapi.py [NAME ...]    # fetch (or refresh) entries and rewrite the dex index
+    python pokeapi.py --all         # every Pokémon PokéAPI lists
+
+Every document is stored gzip-compressed under pokeapi_cache/<resource>/<name>.json.gz
+together with its ETag and fetch time. Within CACHE_TTL it is served from disk;
+after that it is revalidated with a conditional GET, so an unchanged entry costs
+a 304. If PokéAPI can't be reached, a stale copy is used rather than nothing.
+
+The dex metadata gathered along the way (id, species, forms, generation) is
+written to sprites/pokeapi.dex.json, which the planner and spritelib.dex read.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+
+from httpclient import HttpClient, NotFound, TransientError
+from ratelimit import HostRateLimiter
+
+POKEAPI_BASE = "https://pokeapi.co/api/v2"
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HERE, "pokeapi_cache")
+DEX_FILE = os.path.join(HERE, "sprites", "pokeapi.dex.json")
+CACHE_TTL = float(os.environ.get("POKEAPI_CACHE_DAYS", 30)) * 86400
+DEX_VERSION = 1
+
+ROMAN = {'i': 1, 'ii': 2, 'iii': 3, 'iv': 4, 'v': 5, 'vi': 6, 'vii': 7, 'viii': 8, 'ix': 9, 'x': 10}
+
+
+def generation_number(name):
+    """"generation-iv" -> 4"""
+    return ROMAN.get(name.rsplit("-", 1)[-1]) if name else None
+
+
+def dig(data, path):
+    """Value at a '/'-separated path in nested dicts, or None"""
+    for part in path.split('/'):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def make_dex_entry(pokemon, species):
+    """The dex metadata kept for a Pokémon, from its pokemon and pokemon-species documents"""
+    return {'id': pokemon['id'], 'species': pokemon['species']['name'],
+            'generation': generation_number(dig(species, 'generation/name')),
+            'forms': [form['name'] for form in pokemon.get('forms', [])]}
+
+
+class PokeApiCache:
+    """PokéAPI resources by (resource, name), from disk when fresh enough"""
+
+    def __init__(self, client=None, root=CACHE_DIR, ttl=CACHE_TTL):
+        self.client = client or HttpClient()
+        self.root = root
+        self.ttl = ttl
+        self.counts = dict.fromkeys(('hits', 'fetched', 'revalidated', 'stale'), 0)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _path(self, resource, name):
+        return os.path.join(self.root, resource, f"{name}.json.gz")
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _key_lock(self, resource, name):
+        # Several workers asking for the same Pokémon wait for one fetch
+        with self._lock:
+            return self._locks.setdefault((resource, name), threading.Lock())
+
+    def peek(self, resource, name):
+        """The cached entry however old it is, without touching the network, or None"""
+        try:
+            with gzip.open(self._path(resource, name), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, resource, name, entry):
+        path = self._path(resource, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path + ".building", 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(path + ".building", path)
+
+    def get(self, resource, name):
+        """The JSON document for resource/name, or None if PokéAPI has no such entry"""
+        with self._key_lock(resource, name):
+            entry = self.peek(resource, name)
+            if entry and time.time() - entry['fetched_at'] < self.ttl:
+                self._count('hits')
+                return entry['data']
+
+            headers = {'If-None-Match': entry['etag']} if entry and entry.get('etag') else None
+            try:
+                response = self.client.get(f"{POKEAPI_BASE}/{resource}/{name}/", headers=headers)
+            except NotFound:
+                entry = {'fetched_at': time.time(), 'etag': None, 'data': None}
+            except TransientError:
+                if entry is None:
+                    raise
+                self._count('stale')
+                return entry['data']
+            else:
+                if response.status_code == 304:
+                    entry['fetched_at'] = time.time()
+                    self._count('revalidated')
+                else:
+                    entry = {'fetched_at': time.time(), 'etag': response.headers.get('ETag'),
+                             'data': response.json()}
+                    self._count('fetched')
+            self._store(resource, name, entry)
+            return entry['data']
+
+    def pokemon(self, name):
+        return self.get("pokemon", name)
+
+    def species(self, name):
+        return self.get("pokemon-species", name)
+
+    def sprite_urls(self, name, paths):
+        """{sprite type: URL or None} for every path in paths, from one pokemon document"""
+        data = self.pokemon(name)
+        sprites = data.get('sprites') if data else None
+        return {sprite_type: (url if isinstance(url := dig(sprites, path), str) else None)
+                for sprite_type, path in paths.items()}
+
+    def dex_entry(self, name):
+        """{'id', 'species', 'generation', 'forms'} for a Pokémon, or None if PokéAPI doesn't know it"""
+        data = self.pokemon(name)
+        if not data:
+            return None
+        return make_dex_entry(data, self.species(data['species']['name']))
+
+    def cached_dex(self):
+        """dex_entry for every Pokémon already on disk, built without any request"""
+        dex = {}
+        pokemon_dir = os.path.join(self.root, "pokemon")
+        if not os.path.isdir(pokemon_dir):
+            return dex
+        for filename in sorted(os.listdir(pokemon_dir)):
+            if not filename.endswith(".json.gz"):
+                continue
+            entry = self.peek("pokemon", filename[:-len(".json.gz")])
+            data = entry and entry['data']
+            if not data:
+                continue
+            species = self.peek("pokemon-species", data['species']['name']) or {}
+            dex[data['name']] = make_dex_entry(data, species.get('data'))
+        return dex
+
+    def write_dex_index(self, path=DEX_FILE):
+        """Save cached_dex() where the planner and the app look for it"""
+        dex = self.cached_dex()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".building", 'w', encoding='utf-8') as f:
+            json.dump({'version': DEX_VERSION, 'pokemon': dex}, f, separators=(",", ":"))
+        os.replace(path + ".building", path)
+        return dex
+
+
+def load_dex_index(path=DEX_FILE):
+    """{name: dex entry} from the last write_dex_index, or {} if there is none"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('pokemon', {}) if data.get('version') == DEX_VERSION else {}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fill the PokéAPI cache and rebuild the dex index")
+    parser.add_argument("names", nargs="*", help="Pokémon to fetch or refresh")
+    parser.add_argument("--all", action="store_true", help="Every Pokémon PokéAPI lists")
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests per second")
+    args = parser.parse_args(argv)
+
+    cache = PokeApiCache(HttpClient(HostRateLimiter(args.rate)))
+    names = list(args.names)
+    if args.all:
+        listing = cache.client.get(f"{POKEAPI_BASE}/pokemon/?limit=100000").json()
+        names += [result['name'] for result in listing['results']]
+    for name in names:
+        entry = cache.dex_entry(name)
+        if args.names:
+            print(f"{name}: {entry or 'not in PokéAPI'}")
+    dex = cache.write_dex_index()
+    print(f"{len(dex)} Pokémon in {DEX_FILE} ({cache.counts})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._not_before = 0.0  # Monotonic time before which nothing may be sent (see pause)
+        self._lock = threading.Lock()
+        self.waited = 0.0  # Total seconds callers spent blocked
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._not_before:
+                    wait = self._not_before - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self.waited += wait
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller back for seconds (e.g. a server's Retry-After), then allow one request"""
+        with self._lock:
+            not_before = time.monotonic() + seconds
+            if not_before > self._not_before:
+                self._not_before = self._last = not_before
+                self._tokens = 1
+
+
+class HostRateLimiter:
+    """One token bucket per host, so different hosts don't slow each other down"""
+
+    def __init__(self, default_rate, rates=None, burst=1):
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate = self.rates.get(host, self.default_rate)
+                bucket = self._buckets[host] = TokenBucket(rate, self.burst)
+            return bucket
+
+    def acquire(self, url):
+        """Wait for the bucket of url's host"""
+        self.bucket(urlsplit(url).hostname).acquire()
+
+    def pause(self, url, seconds):
+        """Stop all requests to url's host for seconds"""
+        self.bucket(urlsplit(url).hostname).pause(seconds)
+
+    def stats(self):
+        with self._lock:
+            return {host: {'rate': b.rate, 'waited_s': round(b.waited, 1)}
+                    for host, b in self._buckets.items()}
@@ -1,16 +1,11 @@
-import requests
-import os
-import time
-import json
 from pathlib import Path
-from tqdm import tqdm
-from bs4 import BeautifulSoup
+from ratelimit import HostRateLimiter
+from httpclient import HttpClient, HttpError, NotFound
 
 # Configuration
 CONFIG_FILE = "download_progress.json"
 BASE_URL = "https://img.pokemondb.net/sprites"
 REQUEST_DELAY = 1.5  # Seconds between requests
-ERROR_DELAY = 3.0  # Seconds to wait after errors
 
 # Maps generations to their game groups
 GENERATIONS = {
@@ -30,8 +25,7 @@ GENERATIONS = {
 }
 
 
-def download_sprite(game, variant, pokemon):
-    time.sleep(REQUEST_DELAY)
+def download_sprite(game, variant, pokemon, client):
     url = f"{BASE_URL}/{game}/{variant}/{pokemon}.png"
     path = Path("sprites") / game / variant / f"{pokemon}.png"
 
@@ -40,26 +34,21 @@ def download_sprite(game, variant, pokemon):
         if path.exists():
             return True
 
-        response = requests.get(url, timeout=30)
+        response = client.get(url)
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        return True
 
-        if response.status_code == 200:
-            with open(path, 'wb') as f:
-                f.write(response.content)
-            return True
-        elif response.status_code == 404:
-            return False  # Silent fail for expected 404s
-        else:
-            print(f"HTTP Error {response.status_code} for {url}")
-            time.sleep(ERROR_DELAY)
-            return False
-
-    except Exception as e:
+    except NotFound:
+        return False  # Silent fail for expected 404s
+    except (HttpError, OSError) as e:
         print(f"Error downloading {url}: {e}")
-        time.sleep(ERROR_DELAY)
         return False
 
 
 def main():
+    # Pooled keep-alive connections; errors are retried with backoff inside the client
+    client = HttpClient(HostRateLimiter(1 / REQUEST_DELAY))
     # ... (previous setup code remains the same)
 
     total = 0
@@ -1,14 +1,20 @@
-import requests
-import os
-import time
-import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 from bs4 import BeautifulSoup
+from ratelimit import HostRateLimiter
+from httpclient import HttpClient, HttpError, NotFound
+from journal import MISSING, SAVED, open_journal
+from sync import SyncStats, fetch
+from planner import plan_downloads
+from pokeapi import PokeApiCache, load_dex_index
 
 # Configuration
-CONFIG_FILE = "allgen_progress.json"
-REQUEST_DELAY = 1.0  # Conservative delay to prevent bans
+JOURNAL_FILE = "allgen_progress.journal"
+LEGACY_PROGRESS_FILE = "allgen_progress.json"  # Imported into the journal on first run
+REQUEST_DELAY = 1.0  # Conservative delay to prevent bans (seconds between requests per host)
+WORKERS = 4  # Pokémon downloaded at the same time
 
 # Primary source (Pokémon DB)
 POKEDB_BASE = "https://img.pokemondb.net/sprites"
@@ -36,8 +42,7 @@ POKEDB_GAMES = {
     'scarlet-violet': {'gen': 9, 'has_shiny': True}
 }
 
-# Fallback source (PokéAPI)
-POKEAPI_BASE = "https://pokeapi.co/api/v2/pokemon/"
+# Fallback source (PokéAPI); paths into a pokemon document's "sprites"
 POKEAPI_SPRITES = {
     'official-artwork': 'other/official-artwork/front_default',
     'home': 'other/home/front_default',
@@ -45,23 +50,11 @@ POKEAPI_SPRITES = {
 }
 
 
-def load_progress():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    return {'downloaded': [], 'pokemon': []}
-
-
-def save_progress(data):
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(data, f)
-
-
-def get_all_pokemon():
+def get_all_pokemon(client):
     """Get complete list with generation info"""
     print("Fetching Pokémon db...")
     url = "https://pokemondb.net/pokedex/all"
-    response = requests.get(url)
+    response = client.get(url)
     soup = BeautifulSoup(response.text, 'html.parser')
 
     pokemon = []
@@ -75,92 +68,197 @@ def get_all_pokemon():
     return pokemon
 
 
-def download_pokedb_sprite(game, variant, pokemon):
-    url = f"{POKEDB_BASE}/{game}/{variant}/{pokemon}.png"
-    path = Path("sprites") / "pokedb" / game / variant / f"{pokemon}.png"
-
-    try:
+class SpriteDownloader:
+    """Fetches sprite files, journaling every outcome.
+
+    Normally a file the journal (or the disk) already has is skipped without
+    a request. With sync=True every saved file is revalidated with a
+    conditional GET instead: a 304 costs only headers, and a file is only
+    rewritten when the server sends different bytes. Files that 404'd are
+    not asked for again unless recheck_missing.
+    """
+
+    def __init__(self, client, journal, pokeapi=None, sync=False, recheck_missing=False):
+        self.client = client
+        self.journal = journal
+        self.pokeapi = pokeapi or PokeApiCache(client)
+        self.sync = sync
+        self.recheck_missing = recheck_missing
+        self.stats = SyncStats()
+
+    def known(self, key):
+        """The journaled answer for key if no request is needed, else None"""
+        status = self.journal.status(key)
+        if (status == MISSING and not self.recheck_missing) or (status == SAVED and not self.sync):
+            return status == SAVED
+        return None
+
+    def fetch(self, key, url, path):
+        """True once url is saved at path, False if the server has no such file"""
+        known = self.known(key)
+        if known is not None:
+            return known
+        status = self.journal.status(key)
         path.parent.mkdir(parents=True, exist_ok=True)
-        if path.exists():
+        if status is None and path.exists() and not self.sync:
+            self.journal.record(key, SAVED)  # Downloaded before the journal existed
             return True
-
-        time.sleep(REQUEST_DELAY)
-        response = requests.get(url, stream=True, timeout=10)
-
-        if response.status_code == 200:
-            with open(path, 'wb') as f:
-                for chunk in response.iter_content(8192):
-                    f.write(chunk)
-            return True
-        return False
-    except:
-        return False
-
-
-def download_pokeapi_sprite(pokemon, sprite_type):
-    try:
-        data = requests.get(f"{POKEAPI_BASE}{pokemon}").json()
-        parts = POKEAPI_SPRITES[sprite_type].split('/')
-        sprite_url = data['sprites']
-        for part in parts:
-            sprite_url = sprite_url.get(part, {})
-
-        if not sprite_url or not isinstance(sprite_url, str):
+        try:
+            outcome, validators, size = fetch(self.client, url, path,
+                                              self.journal.validators.get(key))
+        except NotFound:
+            self.journal.record(key, MISSING)
             return False
-
-        path = Path("sprites") / "pokeapi" / sprite_type / f"{pokemon}.png"
-        path.parent.mkdir(parents=True, exist_ok=True)
-
-        time.sleep(REQUEST_DELAY)
-        response = requests.get(sprite_url, stream=True)
-        if response.status_code == 200:
-            with open(path, 'wb') as f:
-                for chunk in response.iter_content(8192):
-                    f.write(chunk)
-            return True
-        return False
-    except:
-        return False
-
-
-def main():
-    progress = load_progress()
-    if not progress['pokemon']:
-        progress['pokemon'] = get_all_pokemon()
-        save_progress(progress)
-
-    total = len(progress['pokemon'])
-    print(f"Starting download for {total} Pokémon across all generations")
-
-    with tqdm(total=total, unit="pokemon") as pbar:
-        for name, dex_num in progress['pokemon']:
-            if name in progress['downloaded']:
+        self.stats.add(outcome, size)
+        self.journal.record(key, SAVED, validators)
+        return True
+
+    def pokedb_sprite(self, game, variant, pokemon):
+        return self.fetch(f"pokedb/{game}/{variant}/{pokemon}",
+                          f"{POKEDB_BASE}/{game}/{variant}/{pokemon}.png",
+                          Path("sprites") / "pokedb" / game / variant / f"{pokemon}.png")
+
+    def pokeapi_sprite(self, pokemon, sprite_type):
+        key = f"pokeapi/{sprite_type}/{pokemon}"
+        known = self.known(key)
+        if known is not None:
+            return known
+
+        # One cached pokemon document serves every sprite type
+        sprite_url = self.pokeapi.sprite_urls(pokemon, POKEAPI_SPRITES)[sprite_type]
+        if not sprite_url:
+            self.journal.record(key, MISSING)
+            return False
+        return self.fetch(key, sprite_url, Path("sprites") / "pokeapi" / sprite_type / f"{pokemon}.png")
+
+    def has_pokedb_sprite(self, pokemon):
+        return any(self.journal.status(f"pokedb/{game}/{variant}/{pokemon}") == SAVED
+                   for game in POKEDB_GAMES for variant in ('normal', 'shiny'))
+
+    def pokemon(self, name, sprites):
+        """The planned (game, variant) sprites for one Pokémon, falling back to PokéAPI.
+
+        Returns whether the Pokémon is done: something was saved and nothing
+        failed for a reason other than the sprite not existing.
+        """
+        failed = False
+
+        def attempt(download, *args):
+            nonlocal failed
+            try:
+                return download(*args)
+            except (HttpError, OSError, ValueError) as e:
+                tqdm.write(f"{name}: {e}")
+                failed = True
+                return False
+
+        # Try PokéDB first (game-specific sprites)
+        downloaded = False
+        for game, variant in sprites:
+            if attempt(self.pokedb_sprite, game, variant, name):
+                downloaded = True
+        downloaded = downloaded or self.has_pokedb_sprite(name)  # Saved on an earlier run
+
+        # Fallback to PokéAPI if PokéDB failed
+        if not downloaded and not failed:
+            for sprite_type in POKEAPI_SPRITES:
+                if attempt(self.pokeapi_sprite, name, sprite_type):
+                    downloaded = True
+        return downloaded and not failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Download game sprites for every Pokémon")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="Pokémon downloaded concurrently")
+    parser.add_argument("--rate", type=float, default=1 / REQUEST_DELAY,
+                        help="Requests per second allowed per host")
+    parser.add_argument("--sync", action="store_true",
+                        help="Refresh the Pokémon list and revalidate every saved sprite "
+                             "with conditional requests")
+    parser.add_argument("--recheck-missing", action="store_true",
+                        help="Ask again for sprites that returned 404 before")
+    parser.add_argument("--plan", action="store_true",
+                        help="Only print how many requests a run would make")
+    return parser.parse_args(argv)
+
+
+def adopt_existing_sprites(journal, root=Path("sprites")):
+    """Journal sprites that are on disk but not in the journal (downloaded before it existed)"""
+    adopted = 0
+    for source, pattern in (("pokedb", "*/*/*.png"), ("pokeapi", "*/*.png")):
+        for path in (root / source).glob(pattern):
+            key = "/".join((source,) + path.relative_to(root / source).with_suffix("").parts)
+            if journal.status(key) is None:
+                journal.record(key, SAVED)
+                adopted += 1
+    return adopted
+
+
+def print_client_stats(client):
+    stats = client.stats()
+    print(f"\n{stats['requests']} requests, {stats['retries']} retries "
+          f"({stats['backoff_s']} s backing off), {stats['not_found']} not found, "
+          f"{stats['gave_up']} given up")
+    for host, host_stats in stats['hosts'].items():
+        print(f"  {host}: {host_stats['requests']} requests over {host_stats['connections']} "
+              f"connections ({host_stats['reused']:.0%} reused)")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Same politeness budget as the old sleep, but per host: PokéDB, PokéAPI and
+    # GitHub (where PokéAPI's sprites live) no longer wait for each other
+    limiter = HostRateLimiter(args.rate)
+    client = HttpClient(limiter, pool_size=args.workers)
+
+    # --plan works on an in-memory view: nothing it records reaches the journal file
+    journal = open_journal(JOURNAL_FILE, LEGACY_PROGRESS_FILE, read_only=args.plan)
+    if not journal.pokemon or args.sync:
+        journal.set_pokemon(get_all_pokemon(client))
+    adopted = adopt_existing_sprites(journal)
+    if adopted and not args.plan:
+        print(f"Added {adopted} sprites already on disk to the journal")
+    pokeapi = PokeApiCache(client)
+    downloader = SpriteDownloader(client, journal, pokeapi, sync=args.sync,
+                                  recheck_missing=args.recheck_missing)
+
+    # Every finished sprite file is journaled by the workers as it lands, so an
+    # interrupted Pokémon resumes at the first game it hadn't got yet
+    dex = load_dex_index()
+    plan = plan_downloads(journal.pokemon, POKEDB_GAMES, journal, sync=args.sync,
+                          recheck_missing=args.recheck_missing,
+                          generations={name: entry['generation'] for name, entry in dex.items()})
+    print(plan.summary())
+    if args.plan:
+        journal.close()
+        return
+
+    total = plan.pokemon
+    with tqdm(total=total, initial=total - len(plan.tasks), unit="pokemon") as pbar, \
+            ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(downloader.pokemon, name, sprites): name
+                   for name, sprites in plan.tasks.items()}
+        try:
+            for future in as_completed(futures):
+                name = futures[future]
+                if future.result():
+                    journal.mark_done(name)
                 pbar.update(1)
-                continue
-
-            # Try PokéDB first (game-specific sprites)
-            downloaded = False
-            for game, data in POKEDB_GAMES.items():
-                variants = ['normal'] if not data['has_shiny'] else ['normal', 'shiny']
-                for variant in variants:
-                    if download_pokedb_sprite(game, variant, name):
-                        downloaded = True
-
-            # Fallback to PokéAPI if PokéDB failed
-            if not downloaded:
-                for sprite_type in POKEAPI_SPRITES:
-                    if download_pokeapi_sprite(name, sprite_type):
-                        downloaded = True
-
-            if downloaded:
-                progress['downloaded'].append(name)
-                if len(progress['downloaded']) % 20 == 0:
-                    save_progress(progress)
-
-            pbar.update(1)
-            pbar.set_postfix_str(name)
-
-    save_progress(progress)
+                pbar.set_postfix_str(name)
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            print_client_stats(client)
+            raise
+        finally:
+            if journal.needs_compaction():
+                journal.compact()
+
+    print_client_stats(client)
+    print(downloader.stats.line())
+    if pokeapi.counts['fetched'] or pokeapi.counts['revalidated']:
+        pokeapi.write_dex_index()
     print("\nDownload complete! Sprites saved in:")
     print("  - sprites/pokedb/[game]/[variant]/")
     print("  - sprites/pokeapi/[sprite_type]/")
@@ -0,0 +1,159 @@
+"""Local stand-in for img.pokemondb.net, for trying the scraper without touching the real site.
+
+    python standin_server.py [--root sprites/pokedb] [--port 8765]    # serve a sprite tree
+    python standin_server.py --check [--files 300]                    # full sync, then re-syncs
+
+Files under --root are served at /sprites/<game>/<variant>/<name>.png with
+an ETag and Last-Modified, and conditional requests get 304 Not Modified.
+--check copies a sample of the library into a temp "remote", downloads it
+with the scraper's own SpriteDownloader, changes one remote file and syncs
+twice more, printing what crossed the wire each time.
+"""
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real CDN
+    root = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.count('requests')
+        relative = self.path.split("?")[0].removeprefix("/sprites/")
+        path = os.path.normpath(os.path.join(self.root, relative))
+        if not path.startswith(os.path.abspath(self.root)) or not os.path.isfile(path):
+            return self.reply(404)
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        mtime = int(os.path.getmtime(path))
+        headers = {'ETag': etag, 'Last-Modified': formatdate(mtime, usegmt=True)}
+
+        if_none_match = self.headers.get('If-None-Match')
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_none_match is not None:
+            fresh = etag in [tag.strip() for tag in if_none_match.split(",")]
+        elif if_modified_since is not None:
+            try:
+                fresh = mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                fresh = False
+        else:
+            fresh = False
+        if fresh:
+            self.server.count('not_modified')
+            return self.reply(304, headers=headers)
+        self.server.count('body_bytes', len(body))
+        self.reply(200, body, dict(headers, **{'Content-Type': 'image/png'}))
+
+    def reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root, port=0):
+        handler = type("Handler", (StandinHandler,), {'root': os.path.abspath(root)})
+        super().__init__(("127.0.0.1", port), handler)
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}/sprites"
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + amount
+
+    def take_counts(self):
+        with self._lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def check(source, files):
+    import scraperV2
+    from httpclient import HttpClient
+    from journal import ProgressJournal
+
+    work = Path(tempfile.mkdtemp(prefix="sprite-sync-"))
+    remote = work / "remote"
+    sample = sorted(Path(source).glob("*/*/*.png"))
+    sample = random.Random(0).sample(sample, min(files, len(sample)))
+    for path in sample:
+        target = remote / path.relative_to(source)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, target)
+    keys = [path.relative_to(source).with_suffix("").parts for path in sample]
+
+    server = StandinServer(remote).start()
+    scraperV2.POKEDB_BASE = server.base_url
+    cwd = os.getcwd()
+    os.chdir(work)
+    try:
+        journal = ProgressJournal(str(work / "progress.journal"))
+        client = HttpClient(pool_size=1)
+
+        def run(label, sync):
+            downloader = scraperV2.SpriteDownloader(client, journal, sync=sync)
+            for game, variant, name in keys:
+                downloader.pokedb_sprite(game, variant, name)
+            counts = server.take_counts()
+            print(f"{label:<28} {counts.get('requests', 0):5} requests, "
+                  f"{counts.get('not_modified', 0):5} x 304, "
+                  f"{counts.get('body_bytes', 0) / 1024:8.1f} KB of bodies | {downloader.stats.line()}")
+
+        run("first download", sync=False)
+        run("sync, nothing changed", sync=True)
+        game, variant, name = keys[0]
+        changed = remote / game / variant / f"{name}.png"
+        changed.write_bytes(changed.read_bytes() + b"\0")
+        run("sync, one file changed", sync=True)
+        journal.close()
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        shutil.rmtree(work)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=os.path.join("sprites", "pokedb"))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--files", type=int, default=300, help="Sprites used by --check")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        check(args.root, args.files)
+        return
+    server = StandinServer(args.root, args.port)
+    print(f"Serving {args.root} at {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import threading
+from email.utils import formatdate
+
+NEW = "new"  # Not on disk before
+CHANGED = "changed"  # Server sent different bytes; file rewritten
+UNCHANGED = "unchanged"  # Server sent the same bytes again; file left alone
+NOT_MODIFIED = "not_modified"  # 304: only headers crossed the wire
+
+
+class SyncStats:
+    """Thread-safe tally of fetch outcomes"""
+
+    def __init__(self):
+        self.counts = dict.fromkeys((NEW, CHANGED, UNCHANGED, NOT_MODIFIED), 0)
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, outcome, size=0):
+        with self._lock:
+            self.counts[outcome] += 1
+            self.bytes += size
+
+    def line(self):
+        return (f"{self.counts[NEW]} new, {self.counts[CHANGED]} changed, "
+                f"{self.counts[UNCHANGED]} unchanged, {self.counts[NOT_MODIFIED]} not modified (304), "
+                f"{self.bytes / 1024 / 1024:.1f} MB of sprites downloaded")
+
+
+def conditional_headers(validators, path):
+    """If-None-Match / If-Modified-Since for a file we already have.
+
+    Files fetched before validators were recorded fall back to their mtime,
+    so even the first sync of an old library doesn't download everything.
+    """
+    etag, modified = validators or (None, None)
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+    elif os.path.exists(path):
+        headers['If-Modified-Since'] = formatdate(os.path.getmtime(path), usegmt=True)
+    return headers
+
+
+def fetch(client, url, path, validators=None):
+    """Conditionally GET url into path; returns (outcome, (etag, last_modified), bytes received)
+
+    Raises the client's NotFound/HttpError like client.get. The body goes to
+    a temp file and only replaces path when it differs from what is there.
+    """
+    exists = os.path.exists(path)
+    headers = conditional_headers(validators, path) if exists else None
+    response = client.get(url, headers=headers, stream=True)
+    with response:
+        if response.status_code == 304:
+            # A 304 may repeat the validators; keep the old ones where it doesn't
+            old_etag, old_modified = validators or (None, None)
+            return NOT_MODIFIED, (response.headers.get('ETag', old_etag),
+                                  response.headers.get('Last-Modified', old_modified)), 0
+        new_validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        tmp = f"{path}.part"
+        size = 0
+        with open(tmp, 'wb') as f:
+            for chunk in response.iter_content(8192):
+                f.write(chunk)
+                size += len(chunk)
+
+    if exists and _same_bytes(tmp, path):
+        os.remove(tmp)
+        return UNCHANGED, new_validators, size
+    os.replace(tmp, path)
+    return (CHANGED if exists else NEW), new_validators, size
+
+
+def _same_bytes(a, b):
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        return fa.read() == fb.read()
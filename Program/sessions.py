@@ -0,0 +1,85 @@
+import hashlib
+import os
+import secrets
+import time
+
+# How long a remembered login stays valid
+SESSION_DAYS = float(os.environ.get('POKEMON_SHINY_SESSION_DAYS', 30))
+# Where this machine keeps its token between runs
+TOKEN_FILE = os.environ.get(
+    'POKEMON_SHINY_SESSION_FILE',
+    os.path.join(os.path.expanduser('~'), '.pokemon_shiny_session')
+)
+
+
+def token_hash(token):
+    """Tokens are 256 random bits, so a plain SHA-256 is enough (no need for bcrypt here)"""
+    return hashlib.sha256(token.encode('ascii')).hexdigest()
+
+
+def create_session(conn, username, days=SESSION_DAYS):
+    """Start a session for username and commit; returns the token to hand to the client"""
+    token = secrets.token_urlsafe(32)
+    now = int(time.time())
+    cursor = conn.cursor()
+    # Drop this user's dead sessions while we're here
+    cursor.execute(
+        "DELETE FROM usersession WHERE username = ? AND (expires_at <= ? OR revoked = 1)",
+        (username, now)
+    )
+    cursor.execute(
+        "INSERT INTO usersession (tokenhash, username, created_at, expires_at, revoked) "
+        "VALUES (?, ?, ?, ?, 0)",
+        (token_hash(token), username, now, now + int(days * 86400))
+    )
+    conn.commit()
+    return token
+
+
+def resume_session(conn, token):
+    """Username for a live token, or None (one primary-key lookup)"""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT username FROM usersession "
+        "WHERE tokenhash = ? AND revoked = 0 AND expires_at > ?",
+        (token_hash(token), int(time.time()))
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def revoke_session(conn, token):
+    """Log one token out and commit"""
+    cursor = conn.cursor()
+    cursor.execute("UPDATE usersession SET revoked = 1 WHERE tokenhash = ?", (token_hash(token),))
+    conn.commit()
+
+
+def revoke_all_sessions(conn, username):
+    """Log username out everywhere (e.g. after a password change) and commit"""
+    cursor = conn.cursor()
+    cursor.execute("UPDATE usersession SET revoked = 1 WHERE username = ?", (username,))
+    conn.commit()
+
+
+def load_token(path=TOKEN_FILE):
+    """Token saved by the last login on this machine, or None"""
+    try:
+        with open(path, encoding='ascii') as f:
+            return f.read().strip() or None
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def save_token(token, path=TOKEN_FILE):
+    # Readable by the current user only
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        f.write(token)
+
+
+def forget_token(path=TOKEN_FILE):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,5 @@
+"""Sprite loading and caching shared by every window"""
+from .cache import SpriteCache, get_sprite_cache
+from .dex import DexInfo, get_dex_info
+from .loader import SpriteLoader, get_sprite_loader
+from .resolver import SpriteResolver, get_sprite_resolver
@@ -0,0 +1,152 @@
+"""Prebuilt thumbnail atlases: every sprite pre-rendered at the sizes the UI uses.
+
+    python -m spritelib.atlas [--sizes 100 150] [--raw]
+
+Each size gets thumbs-<size>.atlas (the thumbnails back to back) and
+thumbs-<size>.json (key -> offset, length). At runtime the atlas is
+memory-mapped, so a thumbnail is a slice (plus an inflate unless built with
+--raw) instead of a file open, PNG decode and LANCZOS resample.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from PIL import Image
+
+from .manifest import SPRITE_ROOT, PROGRAM_DIR
+
+ATLAS_DIR = os.path.join(PROGRAM_DIR, "recources", "PNG", "atlas")
+SIZES = (100, 150)  # Collection tiles and the preview/detail image
+ATLAS_VERSION = 1
+
+log = logging.getLogger(__name__)
+
+
+def atlas_key(stem, game, variant):
+    return f"{game}/{variant}/{stem}"
+
+
+def iter_sprites(root=SPRITE_ROOT):
+    """(game, variant, pokemon, path) for every PNG under sprites/pokedb"""
+    for game in sorted(os.listdir(root)):
+        game_dir = os.path.join(root, game)
+        if not os.path.isdir(game_dir):
+            continue
+        for variant in sorted(os.listdir(game_dir)):
+            variant_dir = os.path.join(game_dir, variant)
+            if not os.path.isdir(variant_dir):
+                continue
+            for filename in sorted(os.listdir(variant_dir)):
+                if filename.endswith(".png"):
+                    yield game, variant, filename[:-4], os.path.join(variant_dir, filename)
+
+
+def build(sizes=SIZES, out_dir=ATLAS_DIR, root=SPRITE_ROOT, raw=False):
+    """Render every sprite at each size into one atlas per size; returns {size: bytes written}"""
+    os.makedirs(out_dir, exist_ok=True)
+    codec = "raw" if raw else "zlib"
+    sprites = list(iter_sprites(root))
+    written = {}
+    for size in sizes:
+        atlas_path = os.path.join(out_dir, f"thumbs-{size}.atlas")
+        entries = {}
+        by_content = {}  # Identical source files share one slot
+        offset = 0
+        with open(atlas_path + ".building", "wb") as out:
+            for game, variant, pokemon, path in sprites:
+                with open(path, "rb") as f:
+                    source = f.read()
+                digest = hashlib.sha1(source).hexdigest()
+                if digest not in by_content:
+                    try:
+                        with Image.open(path) as img:
+                            thumb = img.convert("RGBA").resize((size, size), Image.Resampling.LANCZOS)
+                    except (OSError, ValueError) as e:
+                        log.warning("Skipping %s: %s", path, e)
+                        continue
+                    data = thumb.tobytes() if raw else zlib.compress(thumb.tobytes(), 6)
+                    out.write(data)
+                    by_content[digest] = [offset, len(data)]
+                    offset += len(data)
+                entries[atlas_key(pokemon, game, variant)] = by_content[digest]
+        index = {'version': ATLAS_VERSION, 'size': size, 'codec': codec, 'entries': entries}
+        with open(atlas_path + ".json.building", "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        # Swap both files in only once they are complete
+        os.replace(atlas_path + ".building", atlas_path)
+        os.replace(atlas_path + ".json.building", os.path.join(out_dir, f"thumbs-{size}.json"))
+        written[size] = offset
+    return written
+
+
+class Atlas:
+    """Read-only view of one thumbs-<size>.atlas, memory-mapped for the life of the process"""
+
+    def __init__(self, size, out_dir=ATLAS_DIR):
+        with open(os.path.join(out_dir, f"thumbs-{size}.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get('version') != ATLAS_VERSION or index.get('size') != size:
+            raise ValueError(f"thumbs-{size}.json is from another atlas version, rebuild it")
+        self.size = size
+        self.codec = index['codec']
+        self.entries = index['entries']
+        self._file = open(os.path.join(out_dir, f"thumbs-{size}.atlas"), "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, stem, game, variant):
+        """RGBA thumbnail for a sprite file stem (see SpriteManifest.resolve), or None"""
+        entry = self.entries.get(atlas_key(stem, game, variant))
+        if entry is None:
+            return None
+        offset, length = entry
+        data = self._map[offset:offset + length]
+        if self.codec == "zlib":
+            data = zlib.decompress(data)
+        return Image.frombytes("RGBA", (self.size, self.size), data)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+_atlases = {}
+_atlas_lock = threading.Lock()
+
+
+def get_atlas(size):
+    """Shared Atlas for size, or None if it hasn't been built (or is unreadable)"""
+    with _atlas_lock:
+        if size not in _atlases:
+            try:
+                _atlases[size] = Atlas(size)
+            except (OSError, ValueError):
+                _atlases[size] = None
+        return _atlases[size]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the sprite thumbnail atlases")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--out", default=ATLAS_DIR)
+    parser.add_argument("--raw", action="store_true",
+                        help="Store uncompressed pixels (pure slicing, about 5x the disk space)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    written = build(args.sizes, args.out, raw=args.raw)
+    for size, nbytes in written.items():
+        print(f"thumbs-{size}.atlas: {nbytes / 1024 / 1024:.1f} MB")
+    print(f"Built in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFont
+
+DEFAULT_GAME = "scarlet-violet"
+DEFAULT_VARIANT = "normal"
+
+# Budgets in bytes of decoded pixels, overridable through the environment
+IMAGE_BUDGET = int(os.environ.get('POKEMON_SHINY_SPRITE_CACHE_MB', 32)) * 1024 * 1024
+PHOTO_BUDGET = int(os.environ.get('POKEMON_SHINY_PHOTO_CACHE_MB', 16)) * 1024 * 1024
+
+
+def image_bytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+def render_placeholder(pokemon, size):
+    """Transparent tile with the name on it, for sprites we don't have"""
+    img = Image.new('RGBA', (size, size), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    draw.text((10, size // 2 - 10), pokemon, fill="black", font=ImageFont.load_default())
+    return img
+
+
+def load_sprite(pokemon, game, variant, size):
+    """Thumbnail from the prebuilt atlas if there is one, else decode and resize the PNG.
+
+    Sprites the manifest doesn't know, and broken files, give a placeholder.
+    """
+    from .atlas import get_atlas
+    from .manifest import get_manifest
+
+    manifest = get_manifest()
+    stem = manifest.resolve(pokemon, game, variant)
+    if stem is None:
+        return render_placeholder(pokemon, size)
+    atlas = get_atlas(size)
+    if atlas is not None:
+        img = atlas.get(stem, game, variant)
+        if img is not None:
+            return img
+    try:
+        with Image.open(manifest.path(pokemon, game, variant)) as img:
+            return img.convert('RGBA').resize((size, size), Image.Resampling.LANCZOS)
+    except (OSError, ValueError):
+        return render_placeholder(pokemon, size)
+
+
+class LRUCache:
+    """OrderedDict LRU bounded by the summed size of its values"""
+
+    def __init__(self, max_bytes, sizeof):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._items = OrderedDict()  # key -> (value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, count=True):
+        """Cached value or None; count=False leaves the hit/miss stats alone"""
+        entry = self._items.get(key)
+        if entry is None:
+            if count:
+                self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._items[key] = (value, size)
+        self.bytes += size
+        # Always keep the newest entry, even if it alone is over budget
+        while self.bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._items),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SpriteCache:
+    """Process-wide sprite cache keyed by (pokemon, game, variant, size).
+
+    Two layers: decoded PIL images (thread-safe, so workers can fill it) and
+    Tk PhotoImages built from them (Tk thread only). Widgets showing a
+    PhotoImage must keep their own reference (label.image = photo), since
+    eviction only drops the cache's.
+    """
+
+    def __init__(self, image_budget=IMAGE_BUDGET, photo_budget=PHOTO_BUDGET, loader=load_sprite):
+        self._loader = loader
+        self._images = LRUCache(image_budget, image_bytes)
+        self._photos = LRUCache(photo_budget, lambda photo: photo.width() * photo.height() * 4)
+        self._lock = threading.Lock()
+        self._placeholders = {}  # size -> PhotoImage
+
+    def key(self, pokemon, game=DEFAULT_GAME, variant=DEFAULT_VARIANT, size=100):
+        """(content hash, size) once spritelib.dedup has indexed the library, so identical
+        files share one entry; (pokemon, game, variant, size) otherwise"""
+        from .dedup import get_content_index
+        from .manifest import get_manifest
+
+        index = get_content_index()
+        if index is not None:
+            stem = get_manifest().resolve(pokemon, game, variant)
+            digest = index.digest(stem, game, variant) if stem else None
+            if digest:
+                return (digest, size)
+        return (pokemon.lower(), game, variant, size)
+
+    def get_image(self, pokemon, game=DEFAULT_GAME, variant=DEFAULT_VARIANT, size=100):
+        """Decoded, resized PIL image (safe from any thread)"""
+        key = self.key(pokemon, game, variant, size)
+        with self._lock:
+            img = self._images.get(key)
+        if img is None:
+            # Decode outside the lock; two threads racing on one key just both decode
+            img = self._loader(pokemon, game, variant, size)
+            with self._lock:
+                self._images.put(key, img)
+        return img
+
+    def get_photo(self, pokemon, game=DEFAULT_GAME, variant=DEFAULT_VARIANT, size=100, count=True):
+        """Tk PhotoImage for the sprite (call on the Tk thread only).
+
+        count=False is for callers that already counted this lookup with peek_photo.
+        """
+        from PIL import ImageTk
+
+        key = self.key(pokemon, game, variant, size)
+        photo = self._photos.get(key, count=count)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self.get_image(pokemon, game, variant, size))
+            self._photos.put(key, photo)
+        return photo
+
+    def peek_photo(self, pokemon, game=DEFAULT_GAME, variant=DEFAULT_VARIANT, size=100):
+        """PhotoImage if one is ready, without decoding anything (Tk thread only)"""
+        return self._photos.get(self.key(pokemon, game, variant, size))
+
+    def placeholder_photo(self, size=100):
+        """Blank tile shown while a sprite is still being decoded (Tk thread only)"""
+        from PIL import ImageTk
+
+        photo = self._placeholders.get(size)
+        if photo is None:
+            img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            ImageDraw.Draw(img).ellipse((size * 3 // 8, size * 3 // 8, size * 5 // 8, size * 5 // 8),
+                                        fill=(210, 210, 210, 255))
+            photo = self._placeholders[size] = ImageTk.PhotoImage(img)
+        return photo
+
+    def stats(self):
+        with self._lock:
+            images = self._images.stats()
+        return {'images': images, 'photos': self._photos.stats()}
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+        self._photos.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_sprite_cache():
+    """The one SpriteCache every window shares"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SpriteCache()
+    return _cache
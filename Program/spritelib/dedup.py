@@ -0,0 +1,145 @@
+"""Content-addressed view of the sprite library.
+
+    python -m spritelib.dedup           # hash everything, write the index, report
+    python -m spritelib.dedup --link    # also hardlink identical files to one copy
+
+The index (pokedb.content.json) maps every game/variant/stem to the SHA-256
+of its bytes. The sprite cache keys on that hash, so a sprite shared by e.g.
+gold/silver/crystal is decoded and held in memory once. --link keeps the
+folder layout (the scraper, manifest and atlas don't notice) but stores each
+unique file on disk once.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from .manifest import PROGRAM_DIR, SPRITE_ROOT, _tree_stamp, _variant_dirs
+
+CONTENT_FILE = os.path.join(PROGRAM_DIR, "recources", "PNG", "sprites", "pokedb.content.json")
+CONTENT_VERSION = 1
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def scan(root=SPRITE_ROOT):
+    """{game/variant/stem: (path, digest, allocated bytes, inode)} for every sprite"""
+    files = {}
+    for game, variant, variant_dir in _variant_dirs(root):
+        for filename in sorted(os.listdir(variant_dir)):
+            if filename.endswith(".png"):
+                path = os.path.join(variant_dir, filename)
+                st = os.stat(path)
+                # Allocated blocks, not st_size: small PNGs still take a whole block each
+                allocated = getattr(st, 'st_blocks', 0) * 512 or st.st_size
+                files[f"{game}/{variant}/{filename[:-4]}"] = (path, file_digest(path), allocated,
+                                                            (st.st_dev, st.st_ino))
+    return files
+
+
+def disk_usage(files):
+    """Bytes actually used on disk, counting hardlinked files once"""
+    return sum({inode: size for _, _, size, inode in files.values()}.values())
+
+
+def link_duplicates(files):
+    """Replace every duplicate with a hardlink to the first file with the same bytes"""
+    canonical = {}
+    linked = 0
+    for key, (path, digest, size, inode) in files.items():
+        first = canonical.setdefault(digest, (path, inode))
+        if first[1] == inode:
+            continue
+        tmp = path + ".linking"
+        os.link(first[0], tmp)
+        os.replace(tmp, path)
+        linked += 1
+    return linked
+
+
+def write_index(files, root=SPRITE_ROOT, path=CONTENT_FILE):
+    data = {'version': CONTENT_VERSION, 'stamp': _tree_stamp(root),
+            'paths': {key: digest for key, (_, digest, _, _) in files.items()}}
+    with open(path + ".building", 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(path + ".building", path)
+
+
+class ContentIndex:
+    """game/variant/stem -> content hash, as written by this tool"""
+
+    def __init__(self, paths):
+        self.paths = paths
+
+    @classmethod
+    def load(cls, root=SPRITE_ROOT, path=CONTENT_FILE):
+        """Index from disk, or None if it is missing or older than the sprite folders"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != CONTENT_VERSION or data.get('stamp') != _tree_stamp(root):
+            return None
+        return cls(data['paths'])
+
+    def digest(self, stem, game, variant):
+        return self.paths.get(f"{game}/{variant}/{stem}")
+
+
+_index = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def get_content_index():
+    """Shared ContentIndex, or None until `python -m spritelib.dedup` has been run"""
+    global _index, _index_loaded
+    if not _index_loaded:
+        with _index_lock:
+            if not _index_loaded:
+                _index = ContentIndex.load()
+                _index_loaded = True
+    return _index
+
+
+def report(files, sizes=(100, 150)):
+    unique = {digest for _, digest, _, _ in files.values()}
+    logical = sum(size for _, _, size, _ in files.values())
+    unique_bytes = sum({digest: size for _, digest, size, _ in files.values()}.values())
+    print(f"{len(files)} files, {len(unique)} unique ({len(files) - len(unique)} duplicates)")
+    print(f"disk: {logical / 1024 / 1024:.1f} MB as separate files, "
+          f"{unique_bytes / 1024 / 1024:.1f} MB content-addressed, "
+          f"{disk_usage(files) / 1024 / 1024:.1f} MB used now")
+    for size in sizes:
+        per_image = size * size * 4
+        print(f"RAM to hold every {size} px thumbnail decoded: "
+              f"{len(files) * per_image / 1024 / 1024:.1f} MB keyed by path, "
+              f"{len(unique) * per_image / 1024 / 1024:.1f} MB keyed by content")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hash the sprite library and deduplicate it")
+    parser.add_argument("--link", action="store_true",
+                        help="Hardlink byte-identical sprites to a single copy")
+    args = parser.parse_args(argv)
+
+    files = scan()
+    print("Before:")
+    report(files)
+    if args.link:
+        linked = link_duplicates(files)
+        files = scan()
+        print(f"\nHardlinked {linked} duplicates. After:")
+        report(files)
+    # Written last: linking touches the folders, which changes the stamp
+    write_index(files)
+
+
+if __name__ == "__main__":
+    main()
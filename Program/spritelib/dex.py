@@ -0,0 +1,67 @@
+"""Dex metadata (national id, species, forms, generation) from the scraper's PokéAPI cache.
+
+The index is written by recources/PNG/pokeapi.py; until that has run there
+is no index and every lookup returns None.
+"""
+import json
+import os
+import threading
+
+from .manifest import PROGRAM_DIR, name_candidates
+
+DEX_FILE = os.path.join(PROGRAM_DIR, "recources", "PNG", "sprites", "pokeapi.dex.json")
+DEX_VERSION = 1
+# PokéAPI names regional forms <species>-<region> with the region's own name
+REGION_SUFFIXES = {'alolan': 'alola', 'galarian': 'galar', 'hisuian': 'hisui', 'paldean': 'paldea'}
+
+
+class DexInfo:
+    """Lookups by pokedex name ("Mr. Mime", "Alolan Vulpix") into the PokéAPI dex index"""
+
+    def __init__(self, pokemon):
+        self.pokemon = pokemon
+
+    @classmethod
+    def load(cls, path=DEX_FILE):
+        """Index from disk, or None if it is missing or from another version"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != DEX_VERSION:
+            return None
+        return cls(data['pokemon'])
+
+    def entry(self, pokemonname):
+        """{'id', 'species', 'generation', 'forms'} or None"""
+        for stem in name_candidates(pokemonname):
+            species, _, region = stem.rpartition("-")
+            for name in (stem, f"{species}-{REGION_SUFFIXES[region]}" if region in REGION_SUFFIXES else None):
+                if name in self.pokemon:
+                    return self.pokemon[name]
+        return None
+
+    def generation(self, pokemonname):
+        entry = self.entry(pokemonname)
+        return entry['generation'] if entry else None
+
+    def dex_id(self, pokemonname):
+        entry = self.entry(pokemonname)
+        return entry['id'] if entry else None
+
+
+_dex = None
+_dex_loaded = False
+_dex_lock = threading.Lock()
+
+
+def get_dex_info():
+    """Shared DexInfo, or None until the PokéAPI cache has written its index"""
+    global _dex, _dex_loaded
+    if not _dex_loaded:
+        with _dex_lock:
+            if not _dex_loaded:
+                _dex = DexInfo.load()
+                _dex_loaded = True
+    return _dex
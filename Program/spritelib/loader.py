@@ -0,0 +1,144 @@
+import itertools
+import logging
+import queue
+import threading
+
+from .cache import DEFAULT_GAME, DEFAULT_VARIANT, get_sprite_cache
+
+WORKERS = 2
+POLL_MS = 30
+
+log = logging.getLogger(__name__)
+
+
+class SpriteRequest:
+    """Handle for one queued sprite. Cancelling it means on_ready never runs."""
+
+    def __init__(self, key, on_ready, group):
+        self.key = key
+        self.on_ready = on_ready
+        self.group = group
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class SpriteLoader:
+    """Decodes sprites on worker threads and hands PhotoImages back to Tk.
+
+    load() answers straight from the PhotoImage cache when it can; otherwise
+    the caller shows a placeholder and on_ready(photo) runs on the Tk thread
+    via root.after once the decode is done. The most recent request is
+    decoded first, since that is what just scrolled into view, and decodes
+    whose requests were all cancelled are skipped.
+    """
+
+    def __init__(self, root, cache=None, workers=WORKERS, poll_ms=POLL_MS):
+        self.root = root
+        self.cache = cache or get_sprite_cache()
+        self.poll_ms = poll_ms
+        self._queue = queue.PriorityQueue()  # (-sequence, key): newest first
+        self._results = queue.Queue()
+        self._sequence = itertools.count()
+        self._waiting = {}  # key -> requests waiting for it
+        self._decoding = set()
+        self._lock = threading.Lock()
+        self._polling = False
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"sprite-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def load(self, pokemon, on_ready, game=DEFAULT_GAME, variant=DEFAULT_VARIANT, size=100,
+             group=None):
+        """(photo, None) if it is cached, else (None, request) and on_ready(photo) later (Tk thread)"""
+        photo = self.cache.peek_photo(pokemon, game, variant, size)
+        if photo is not None:
+            return photo, None
+
+        key = (pokemon, game, variant, size)
+        request = SpriteRequest(key, on_ready, group)
+        if group is not None:
+            group.add(request)
+        with self._lock:
+            self._waiting.setdefault(key, []).append(request)
+        # Queued again even if already waiting: the new entry jumps the queue
+        self._queue.put((-next(self._sequence), key))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return None, request
+
+    def _wanted(self, key):
+        """True if someone still wants key and no other worker is on it (claims it)"""
+        with self._lock:
+            requests = self._waiting.get(key)
+            if not requests or key in self._decoding:
+                return False
+            if all(request.cancelled for request in requests):
+                del self._waiting[key]
+                return False
+            self._decoding.add(key)
+            return True
+
+    def _work(self):
+        while True:
+            _, key = self._queue.get()
+            if key is None:
+                return
+            if not self._wanted(key):
+                continue
+            try:
+                self.cache.get_image(*key)
+            except Exception:
+                log.exception("Could not decode sprite %s", key)
+            self._results.put(key)
+
+    def _poll(self):
+        """Swap finished sprites in on the Tk thread, rescheduling while work is pending"""
+        while True:
+            try:
+                key = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._decoding.discard(key)
+                requests = self._waiting.pop(key, [])
+            live = [request for request in requests if not request.cancelled]
+            for request in requests:
+                if request.group is not None:
+                    request.group.discard(request)
+            if not live:
+                continue
+            try:
+                # The decoded image is cached now, so this only builds the PhotoImage;
+                # load() already counted the lookup when peek_photo missed
+                photo = self.cache.get_photo(*key, count=False)
+                for request in live:
+                    request.on_ready(photo)
+            except Exception:
+                log.exception("Could not show sprite %s", key)
+
+        with self._lock:
+            pending = bool(self._waiting)
+        if pending:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put((float('inf'), None))
+
+
+_loader = None
+
+
+def get_sprite_loader(widget):
+    """Process-wide loader, bound to the Tk root that owns widget"""
+    global _loader
+    if _loader is None:
+        _loader = SpriteLoader(widget.nametowidget('.'))
+    return _loader
@@ -0,0 +1,168 @@
+"""Index of which sprites exist under sprites/pokedb, so nothing is found by failing to open it.
+
+    python -m spritelib.manifest [--check NAME ...]
+
+The manifest is rebuilt automatically when a game/variant folder changes,
+so running this by hand is only needed to inspect it.
+"""
+import json
+import logging
+import os
+import threading
+import unicodedata
+
+PROGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPRITE_ROOT = os.path.join(PROGRAM_DIR, "recources", "PNG", "sprites", "pokedb")
+MANIFEST_FILE = os.path.join(PROGRAM_DIR, "recources", "PNG", "sprites", "pokedb.manifest.json")
+MANIFEST_VERSION = 1
+
+log = logging.getLogger(__name__)
+
+# Regional forms are stored by the sprite sites as <species>-<region>
+REGIONAL_PREFIXES = ('alolan', 'galarian', 'hisuian', 'paldean')
+_SYMBOLS = {'♀': '-f', '♂': '-m', "'": '', '’': '', '.': '', ':': ''}
+
+
+def normalize_name(pokemonname):
+    """pokedex.pokemonname -> sprite file stem ("Mr. Mime" -> "mr-mime", "Flabébé" -> "flabebe")"""
+    name = pokemonname.strip().lower()
+    for symbol, replacement in _SYMBOLS.items():
+        name = name.replace(symbol, replacement)
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return "-".join(name.split())
+
+
+def name_candidates(pokemonname):
+    """Stems to try in order: the exact form, then the base species for regional forms"""
+    slug = normalize_name(pokemonname)
+    first, _, rest = slug.partition("-")
+    if first in REGIONAL_PREFIXES and rest:
+        return [f"{rest}-{first}", rest]
+    return [slug]
+
+
+def _variant_dirs(root):
+    for game in sorted(os.listdir(root)):
+        game_dir = os.path.join(root, game)
+        if os.path.isdir(game_dir):
+            for variant in sorted(os.listdir(game_dir)):
+                variant_dir = os.path.join(game_dir, variant)
+                if os.path.isdir(variant_dir):
+                    yield game, variant, variant_dir
+
+
+def _tree_stamp(root):
+    """Changes whenever a sprite is added to or removed from any folder"""
+    return max((os.stat(d).st_mtime_ns for _, _, d in _variant_dirs(root)), default=0)
+
+
+def build(root=SPRITE_ROOT):
+    """Walk root into the manifest dict: one bitmask of game/variant folders per name"""
+    folders = []
+    names = {}
+    for game, variant, variant_dir in _variant_dirs(root):
+        bit = 1 << len(folders)
+        folders.append(f"{game}/{variant}")
+        for filename in os.listdir(variant_dir):
+            if filename.endswith(".png"):
+                stem = filename[:-4]
+                names[stem] = names.get(stem, 0) | bit
+    return {'version': MANIFEST_VERSION, 'stamp': _tree_stamp(root),
+            'folders': folders, 'names': names}
+
+
+class SpriteManifest:
+    """O(1) answers to "is there a <variant> sprite of <pokemon> in <game>?"
+
+    Lookups by pokedex name are memoized, misses included, so a sprite we
+    know is missing costs one dict hit instead of a failed open.
+    """
+
+    def __init__(self, data, root=SPRITE_ROOT):
+        self.root = root
+        self.folders = data['folders']
+        self.names = data['names']
+        self._bits = {folder: 1 << i for i, folder in enumerate(self.folders)}
+        self._resolved = {}  # (pokemonname, game, variant) -> stem or None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, root=SPRITE_ROOT, path=MANIFEST_FILE):
+        """Manifest from disk, rebuilt and saved first if it is missing or out of date"""
+        data = None
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if (not data or data.get('version') != MANIFEST_VERSION
+                or data.get('stamp') != _tree_stamp(root)):
+            data = build(root)
+            try:
+                with open(path + ".building", 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(path + ".building", path)
+            except OSError as e:
+                log.warning("Could not save the sprite manifest: %s", e)
+        return cls(data, root)
+
+    def has(self, stem, game, variant):
+        return bool(self.names.get(stem, 0) & self._bits.get(f"{game}/{variant}", 0))
+
+    def folders_for(self, stem):
+        """Every (game, variant) that has a sprite for stem"""
+        mask = self.names.get(stem, 0)
+        return [tuple(folder.split("/")) for i, folder in enumerate(self.folders) if mask >> i & 1]
+
+    def resolve(self, pokemonname, game, variant):
+        """File stem of the sprite for a pokedex name in game/variant, or None"""
+        key = (pokemonname, game, variant)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        stem = next((s for s in name_candidates(pokemonname) if self.has(s, game, variant)), None)
+        with self._lock:
+            self._resolved[key] = stem
+        return stem
+
+    def path(self, pokemonname, game, variant):
+        """Full path of the sprite, or None if there isn't one"""
+        stem = self.resolve(pokemonname, game, variant)
+        if stem is None:
+            return None
+        return os.path.join(self.root, game, variant, f"{stem}.png")
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest():
+    """Process-wide manifest, loaded (or rebuilt) on first use"""
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = SpriteManifest.load()
+    return _manifest
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and query the sprite manifest")
+    parser.add_argument("--check", nargs="*", default=[], metavar="NAME",
+                        help="Pokédex names to look up")
+    args = parser.parse_args(argv)
+
+    manifest = get_manifest()
+    print(f"{len(manifest.names)} names in {len(manifest.folders)} folders ({MANIFEST_FILE})")
+    for name in args.check:
+        stems = name_candidates(name)
+        found = [f"{g}/{v}" for s in stems for g, v in manifest.folders_for(s)]
+        print(f"{name} -> {', '.join(stems)}: {', '.join(found) or 'no sprites'}")
+
+
+if __name__ == "__main__":
+    main()
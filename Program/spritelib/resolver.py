@@ -0,0 +1,95 @@
+import threading
+
+from .cache import DEFAULT_GAME, DEFAULT_VARIANT
+from .manifest import get_manifest
+
+# game.gameid -> sprites/pokedb folder. Games without sprites of their own
+# (Let's Go, Colosseum, GO, HOME, ...) are left out and use the fallback chain.
+GAME_FOLDERS = {
+    1: 'red-blue', 2: 'red-blue', 3: 'yellow', 4: 'red-blue',
+    5: 'gold', 6: 'silver', 7: 'crystal',
+    8: 'ruby-sapphire', 9: 'ruby-sapphire', 10: 'emerald',
+    11: 'firered-leafgreen', 12: 'firered-leafgreen',
+    13: 'diamond-pearl', 14: 'diamond-pearl', 15: 'platinum',
+    16: 'heartgold-soulsilver', 17: 'heartgold-soulsilver',
+    18: 'black-white', 19: 'black-white', 20: 'black-2-white-2', 21: 'black-2-white-2',
+    22: 'x-y', 23: 'x-y', 24: 'omega-ruby-alpha-sapphire', 25: 'omega-ruby-alpha-sapphire',
+    26: 'sun-moon', 27: 'sun-moon', 28: 'ultra-sun-ultra-moon', 29: 'ultra-sun-ultra-moon',
+    32: 'sword-shield', 33: 'sword-shield',
+    34: 'brilliant-diamond-shining-pearl', 35: 'brilliant-diamond-shining-pearl',
+    36: 'legends-arceus',
+    37: 'scarlet-violet', 38: 'scarlet-violet',
+}
+VARIANTS = ('shiny', 'normal')  # Everything in the collection is shiny, so that comes first
+
+
+class SpriteResolver:
+    """Picks the sprite folder and variant for a catch from the game it was caught in.
+
+    Per game the search order is fixed: the game's own folder, the other
+    folders of its generation (newest first), then every folder newest
+    first, all in the shiny variant before any normal one. The chains are
+    built once from the game table; the answer per (pokemon, game) is
+    memoized, so after the first tile a lookup is one dict hit.
+    """
+
+    def __init__(self, refdata, manifest=None):
+        self.refdata = refdata
+        self.manifest = manifest or get_manifest()
+        generations = refdata.game_generations
+
+        folder_generation = {}
+        folder_newest = {}
+        for gameid, folder in GAME_FOLDERS.items():
+            folder_generation[folder] = generations.get(gameid, 0)
+            folder_newest[folder] = max(folder_newest.get(folder, 0), gameid)
+        newest_first = sorted(folder_generation, reverse=True,
+                              key=lambda f: (folder_generation[f], folder_newest[f]))
+
+        self._chains = {}  # gameid -> [(folder, variant), ...]
+        for gameid, generation in generations.items():
+            folders = [GAME_FOLDERS.get(gameid)]
+            folders += [f for f in newest_first if folder_generation[f] == generation]
+            folders += newest_first
+            folders = list(dict.fromkeys(f for f in folders if f))
+            self._chains[gameid] = [(f, v) for v in VARIANTS for f in folders]
+        self._default_chain = [(f, v) for v in VARIANTS for f in newest_first]
+        self._table = {}  # (pokemonname, gameid) -> (folder, variant) or None
+        self._lock = threading.Lock()
+
+    def resolve_id(self, pokemon, gameid):
+        """(folder, variant) of the best sprite for pokemon caught in gameid, or None"""
+        key = (pokemon, gameid)
+        try:
+            return self._table[key]
+        except KeyError:
+            pass
+        chain = self._chains.get(gameid, self._default_chain)
+        found = next(((folder, variant) for folder, variant in chain
+                      if self.manifest.resolve(pokemon, folder, variant)), None)
+        with self._lock:
+            self._table[key] = found
+        return found
+
+    def resolve(self, pokemon, gamename):
+        """Same as resolve_id, from the game's display name (as in collection rows)"""
+        return self.resolve_id(pokemon, self.refdata.games.lookup(gamename) if gamename else None)
+
+    def sprite_args(self, pokemon, gamename):
+        """game/variant keywords for SpriteCache and SpriteLoader"""
+        found = self.resolve(pokemon, gamename)
+        game, variant = found or (DEFAULT_GAME, DEFAULT_VARIANT)
+        return {'game': game, 'variant': variant}
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_sprite_resolver(refdata):
+    """Shared resolver for this reference data snapshot (rebuilt when it is reloaded)"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None or _resolver.refdata is not refdata:
+            _resolver = SpriteResolver(refdata)
+        return _resolver
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The app runs from Program/ and the scraper from recources/PNG/, each importing its modules flat
+PROGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (PROGRAM_DIR, os.path.join(PROGRAM_DIR, "recources", "PNG")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
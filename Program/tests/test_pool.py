@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+
+from db.backends import SqliteBackend
+from db.pool import ConnectionPool, PoolClosed, PoolTimeout
+
+
+@pytest.fixture
+def backend():
+    backend = SqliteBackend(":memory:")
+    yield backend
+    backend.close()
+
+
+def make_pool(backend, **options):
+    options.setdefault('checkout_timeout', 1.0)
+    return ConnectionPool(backend.connect, **options)
+
+
+def test_returned_connection_is_reused(backend):
+    pool = make_pool(backend)
+    with pool.get() as conn:
+        first = conn.raw
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM pokedex")
+        assert cursor.fetchone()[0] > 0
+    assert pool.stats()['idle'] == 1
+
+    with pool.get() as conn:
+        assert conn.raw is first
+    stats = pool.stats()
+    assert (stats['checkouts'], stats['connects'], stats['open'], stats['waits']) == (2, 1, 1, 0)
+
+
+def test_closed_handle_cannot_be_used(backend):
+    pool = make_pool(backend)
+    conn = pool.get()
+    conn.close()
+    conn.close()  # Returning twice is harmless
+    with pytest.raises(PoolClosed):
+        conn.cursor()
+    assert pool.stats()['idle'] == 1
+
+
+def test_release_rolls_back_unfinished_work(backend):
+    pool = make_pool(backend)
+    with pool.get() as conn:
+        conn.cursor().execute("INSERT INTO account VALUES ('pool', 'x')")
+    with pool.get() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM account WHERE username = 'pool'")
+        assert cursor.fetchone()[0] == 0
+
+
+def test_opens_up_to_max_size(backend):
+    pool = make_pool(backend, max_size=3)
+    conns = [pool.get() for _ in range(3)]
+    assert len({id(conn.raw) for conn in conns}) == 3
+    stats = pool.stats()
+    assert (stats['open'], stats['idle'], stats['connects']) == (3, 0, 3)
+    for conn in conns:
+        conn.close()
+    assert pool.stats()['idle'] == 3
+
+
+def test_full_pool_times_out_and_counts_the_wait(backend):
+    pool = make_pool(backend, max_size=1, checkout_timeout=0.05)
+    held = pool.get()
+    with pytest.raises(PoolTimeout):
+        pool.get()
+    held.close()
+    stats = pool.stats()
+    assert (stats['waits'], stats['checkouts'], stats['connects']) == (1, 1, 1)
+
+
+def test_waiter_gets_the_connection_when_it_is_returned(backend):
+    pool = make_pool(backend, max_size=1)
+    held = pool.get()
+    raw = held.raw
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.get()))
+    waiter.start()
+    time.sleep(0.05)
+    assert not got
+    held.close()
+    waiter.join(1)
+    assert got and got[0].raw is raw
+    got[0].close()
+    stats = pool.stats()
+    assert (stats['waits'], stats['checkouts'], stats['connects']) == (1, 2, 1)
+
+
+def test_broken_idle_connection_fails_health_check_and_is_replaced(backend):
+    pool = make_pool(backend)
+    with pool.get() as conn:
+        broken = conn.raw
+    broken.close()  # E.g. the server dropped it while it sat in the pool
+
+    with pool.get() as conn:
+        assert conn.raw is not broken
+        conn.cursor().execute("SELECT 1")
+    stats = pool.stats()
+    assert (stats['health_failures'], stats['connects'], stats['open']) == (1, 2, 1)
+
+
+def test_discarded_connection_is_not_reused(backend):
+    pool = make_pool(backend)
+    conn = pool.get()
+    raw = conn.raw
+    conn.discard()
+    assert pool.stats()['open'] == 0
+    with pool.get() as conn:
+        assert conn.raw is not raw
+
+
+def test_idle_connections_expire(backend):
+    pool = make_pool(backend, idle_timeout=0.01)
+    with pool.get() as conn:
+        expired = conn.raw
+    time.sleep(0.05)
+
+    with pool.get() as conn:
+        assert conn.raw is not expired
+    stats = pool.stats()
+    assert (stats['idle_expired'], stats['connects'], stats['open']) == (1, 2, 1)
+
+
+def test_close_shuts_idle_connections_and_refuses_new_checkouts(backend):
+    pool = make_pool(backend, max_size=2)
+    idle = pool.get()
+    busy = pool.get()
+    idle.close()
+    pool.close()
+    assert pool.stats()['open'] == 1
+
+    with pytest.raises(PoolClosed):
+        pool.get()
+    raw = busy.raw
+    busy.close()  # Closes for real now instead of going back to the pool
+    assert pool.stats()['open'] == 0
+    with pytest.raises(Exception):
+        raw.execute("SELECT 1")
+
+
+def test_close_wakes_waiters(backend):
+    pool = make_pool(backend, max_size=1, checkout_timeout=5.0)
+    held = pool.get()
+    errors = []
+
+    def wait():
+        try:
+            pool.get()
+        except PoolClosed as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.05)
+    pool.close()
+    waiter.join(1)
+    assert not waiter.is_alive() and errors
+    held.close()
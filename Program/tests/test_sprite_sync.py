@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+import scraperV2
+from httpclient import HttpClient
+from journal import MISSING, SAVED, ProgressJournal
+from standin_server import StandinServer
+from sync import CHANGED, NEW, NOT_MODIFIED, UNCHANGED
+
+KEYS = [("scarlet-violet", variant, name)
+        for variant in ("normal", "shiny") for name in ("pikachu", "eevee", "ditto")]
+OLD = 1_600_000_000  # mtime given to the local copies, so a rewrite is easy to spot
+
+
+@pytest.fixture
+def remote(tmp_path):
+    root = tmp_path / "remote"
+    for game, variant, name in KEYS:
+        path = root / game / variant / f"{name}.png"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(f"{game}/{variant}/{name}".encode() * 50)
+    return root
+
+
+@pytest.fixture
+def server(remote, monkeypatch):
+    server = StandinServer(remote).start()
+    monkeypatch.setattr(scraperV2, "POKEDB_BASE", server.base_url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def local(tmp_path, monkeypatch):
+    work = tmp_path / "local"
+    work.mkdir()
+    monkeypatch.chdir(work)  # SpriteDownloader saves under ./sprites
+    return work
+
+
+@pytest.fixture
+def client():
+    client = HttpClient(pool_size=1, retries=0)
+    yield client
+    client.close()
+
+
+def run(server, client, journal, sync):
+    downloader = scraperV2.SpriteDownloader(client, journal, sync=sync)
+    for game, variant, name in KEYS:
+        assert downloader.pokedb_sprite(game, variant, name)
+    return downloader.stats.counts, server.take_counts()
+
+
+def local_files(local):
+    files = {}
+    for game, variant, name in KEYS:
+        path = local / "sprites" / "pokedb" / game / variant / f"{name}.png"
+        files[game, variant, name] = (path.read_bytes(), os.path.getmtime(path))
+    return files
+
+
+def age_local_copies(local):
+    for game, variant, name in KEYS:
+        os.utime(local / "sprites" / "pokedb" / game / variant / f"{name}.png", (OLD, OLD))
+
+
+def test_sync_only_downloads_what_changed(server, client, local, remote):
+    journal = ProgressJournal(str(local / "progress.journal"))
+
+    counts, wire = run(server, client, journal, sync=False)
+    assert counts[NEW] == len(KEYS)
+    assert wire['requests'] == len(KEYS) and wire.get('not_modified', 0) == 0
+    assert all(journal.status(f"pokedb/{'/'.join(key)}") == SAVED for key in KEYS)
+    age_local_copies(local)
+    before = local_files(local)
+
+    # Nothing changed: every file is a 304 and nothing on disk is touched
+    counts, wire = run(server, client, journal, sync=True)
+    assert counts[NOT_MODIFIED] == len(KEYS)
+    assert counts[NEW] == counts[CHANGED] == counts[UNCHANGED] == 0
+    assert wire['requests'] == wire['not_modified'] == len(KEYS)
+    assert wire.get('body_bytes', 0) == 0
+    assert local_files(local) == before
+
+    # One remote file changes: only that one comes over the wire and is rewritten
+    game, variant, name = changed = KEYS[0]
+    remote_file = remote / game / variant / f"{name}.png"
+    remote_file.write_bytes(remote_file.read_bytes() + b"\0")
+    counts, wire = run(server, client, journal, sync=True)
+    assert counts[CHANGED] == 1 and counts[NOT_MODIFIED] == len(KEYS) - 1
+    assert wire['not_modified'] == len(KEYS) - 1
+    assert wire['body_bytes'] == remote_file.stat().st_size
+
+    after = local_files(local)
+    assert after[changed][0] == remote_file.read_bytes()
+    assert after[changed][1] != OLD
+    assert {key: value for key, value in after.items() if key != changed} == \
+           {key: value for key, value in before.items() if key != changed}
+    journal.close()
+
+
+def test_plain_run_skips_saved_files_without_a_request(server, client, local):
+    journal = ProgressJournal(str(local / "progress.journal"))
+    run(server, client, journal, sync=False)
+    server.take_counts()
+
+    counts, wire = run(server, client, journal, sync=False)
+    assert wire == {}
+    assert sum(counts.values()) == 0
+    journal.close()
+
+
+def test_missing_sprite_is_journaled_and_not_asked_for_again(server, client, local):
+    journal = ProgressJournal(str(local / "progress.journal"))
+    downloader = scraperV2.SpriteDownloader(client, journal, sync=True)
+    assert not downloader.pokedb_sprite("scarlet-violet", "normal", "missingno")
+    assert journal.status("pokedb/scarlet-violet/normal/missingno") == MISSING
+    server.take_counts()
+
+    assert not downloader.pokedb_sprite("scarlet-violet", "normal", "missingno")
+    assert server.take_counts() == {}
+    journal.close()
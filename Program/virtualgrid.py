@@ -0,0 +1,127 @@
+import tkinter as tk
+from tkinter import ttk
+
+OVERSCAN_ROWS = 2  # Rows kept ready above and below the viewport
+
+
+class VirtualGrid:
+    """Scrollable grid that only has widgets for the rows in view.
+
+    The canvas scroll region is sized from the total item count, so the
+    scrollbar is right from the start, while a small pool of tile widgets is
+    moved around and refilled as the user scrolls. Items can arrive later than
+    the count (e.g. page by page): slots past the loaded items get
+    update_tile(tile, None) and on_need_more() is called to fetch them.
+    While more items may come, a row of loading slots is kept past the
+    loaded ones whatever the count says, so a stale count can't stop the
+    paging; once extend(..., more=False) arrives the item list is the total.
+
+    create_tile(parent) builds one tile widget; update_tile(tile, item) fills it.
+    """
+
+    def __init__(self, parent, columns, tile_width, tile_height, create_tile, update_tile,
+                 on_need_more=None, overscan=OVERSCAN_ROWS):
+        self.columns = columns
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.create_tile = create_tile
+        self.update_tile = update_tile
+        self.on_need_more = on_need_more
+        self.overscan = overscan
+
+        self.items = []
+        self.total = 0
+        self.more = True  # Until the owner says the last items have arrived
+        self._free = []  # (tile, canvas item id) not showing anything
+        self._shown = {}  # item index -> [tile, canvas item id, showing the loaded item?]
+
+        self.frame = tk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0,
+                                width=columns * tile_width)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    @property
+    def slots(self):
+        """Item slots laid out: the expected total, plus a loading row while more may come"""
+        if self.more:
+            return max(self.total, len(self.items) + self.columns)
+        return len(self.items)
+
+    @property
+    def rows(self):
+        return -(-self.slots // self.columns)
+
+    def set_total(self, total):
+        """How many items there are expected to be; sizes the scroll region"""
+        self.total = max(total, len(self.items))
+        self._resize()
+
+    def extend(self, items, more=True):
+        """Append loaded items; more=False when they were the last ones"""
+        self.items.extend(items)
+        self.more = more
+        if not more:
+            self.total = len(self.items)
+        self._resize()
+
+    def _resize(self):
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.tile_width,
+                                            self.rows * self.tile_height))
+        self.refresh()
+
+    def visible_range(self):
+        """First and last item index that should have a tile right now"""
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.tile_height)
+        first_row = max(0, int(top // self.tile_height) - self.overscan)
+        last_row = min(self.rows - 1, int((top + height) // self.tile_height) + self.overscan)
+        if last_row < first_row:
+            return 0, -1
+        return first_row * self.columns, min(self.slots, (last_row + 1) * self.columns) - 1
+
+    def refresh(self):
+        """Give every slot in view a tile, recycling tiles that scrolled out"""
+        if not self.canvas.winfo_exists():
+            return
+        first, last = self.visible_range()
+        wanted = range(first, last + 1)
+
+        for index in [i for i in self._shown if i not in wanted]:
+            tile, item_id, _ = self._shown.pop(index)
+            self.canvas.itemconfigure(item_id, state="hidden")
+            self._free.append((tile, item_id))
+
+        for index in wanted:
+            slot = self._shown.get(index)
+            if slot is None:
+                x = (index % self.columns) * self.tile_width
+                y = (index // self.columns) * self.tile_height
+                if self._free:
+                    tile, item_id = self._free.pop()
+                    self.canvas.coords(item_id, x, y)
+                    self.canvas.itemconfigure(item_id, state="normal")
+                else:
+                    tile = self.create_tile(self.canvas)
+                    item_id = self.canvas.create_window(x, y, window=tile, anchor="nw",
+                                                        width=self.tile_width,
+                                                        height=self.tile_height)
+                slot = self._shown[index] = [tile, item_id, None]
+            loaded = index < len(self.items)
+            if slot[2] != loaded:  # Newly placed, or its item just arrived
+                self.update_tile(slot[0], self.items[index] if loaded else None)
+                slot[2] = loaded
+
+        if self.more and last >= len(self.items) and self.on_need_more:
+            self.on_need_more()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()